@@ -0,0 +1,261 @@
+"""
+Run the benchmarks, reporting time and peak memory at each scale
+
+python -m benchmarks [--scales 2 4 6] [--benchmarks wires boxes] [--backends text]
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from typing import Callable, Dict, Optional, Tuple
+
+from benchmarks.generators import (
+    box_grid,
+    circuit_program,
+    corner_field,
+    corner_lattice,
+    dot_mesh,
+    template_diagram,
+    templates,
+    wire_maze,
+)
+from parse_2d import (
+    BoxTokenizer,
+    BudgetExceeded,
+    Diagram,
+    Directions,
+    NestedBoxTokenizer,
+    SparseDiagram,
+    TemplateTokenizer,
+    TextDiagram,
+    TinyRegion,
+    Token,
+    WireTokenizer,
+    WorkBudget,
+    tokenize,
+)
+from samples.circuit_diagram import parse_circuit_diagram
+
+backends = {
+    "diagram": Diagram.from_string,
+    "text": TextDiagram.from_string,
+    "sparse": SparseDiagram.from_string,
+}
+
+wire_tokenizer = WireTokenizer(
+    {
+        "-": Directions.horizontal,
+        "|": Directions.vertical,
+        "+": Directions.all,
+    }
+)
+
+
+def box_contents(diagram):
+    (_, _), (width, height) = diagram.bounds
+
+    return list(tokenize(diagram[(1, 1) : (width - 1, height - 1)], [box_tokenizer]))
+
+
+box_tokenizer = BoxTokenizer(
+    {
+        Directions.UP: frozenset({"─"}),
+        Directions.UP_RIGHT: frozenset({"┐"}),
+        Directions.RIGHT: frozenset({"│"}),
+        Directions.DOWN_RIGHT: frozenset({"┘"}),
+        Directions.DOWN: frozenset({"─"}),
+        Directions.DOWN_LEFT: frozenset({"└"}),
+        Directions.LEFT: frozenset({"│"}),
+        Directions.UP_LEFT: frozenset({"┌"}),
+    },
+    box_contents,
+)
+
+nested_box_tokenizer = NestedBoxTokenizer(
+    box_tokenizer.edge_symbols,
+    lambda diagram, children: [child.value for child in children],
+)
+
+
+class LenientBoxTokenizer(BoxTokenizer):
+    """
+    Box tokenizer that skips symbols that do not form a box, as a parser of
+    untrusted diagrams might
+    """
+
+    def extract_token(self, diagram, index):
+        token = super().extract_token(diagram, index)
+
+        if token is None:
+            return Token(TinyRegion(index), None)
+
+        return token
+
+
+ascii_box_tokenizer = LenientBoxTokenizer(
+    {
+        Directions.UP: frozenset({"-"}),
+        Directions.UP_RIGHT: frozenset({"+"}),
+        Directions.RIGHT: frozenset({"|"}),
+        Directions.DOWN_RIGHT: frozenset({"+"}),
+        Directions.DOWN: frozenset({"-"}),
+        Directions.DOWN_LEFT: frozenset({"+"}),
+        Directions.LEFT: frozenset({"|"}),
+        Directions.UP_LEFT: frozenset({"+"}),
+    },
+    lambda diagram: None,
+)
+
+mesh_tokenizer = WireTokenizer({".": Directions.all})
+
+template_tokenizers = [
+    TemplateTokenizer(Diagram.from_string(template), template) for template in templates
+]
+
+
+def tokenize_benchmark(generator, tokenizers):
+    def setup(cells: int, backend: str, budget: Callable[[], Optional[WorkBudget]]):
+        diagram = backends[backend](generator(cells))
+
+        def run():
+            return list(tokenize(diagram, tokenizers, budget=budget()))
+
+        return run
+
+    return setup
+
+
+def circuit_benchmark(
+    cells: int, backend: str, budget: Callable[[], Optional[WorkBudget]]
+):
+    program = circuit_program(cells)
+
+    return lambda: parse_circuit_diagram(program)
+
+
+Setup = Callable[[int, str, Callable[[], Optional[WorkBudget]]], Callable[[], object]]
+
+benchmarks: Dict[str, Setup] = {
+    "wires": tokenize_benchmark(wire_maze, [wire_tokenizer]),
+    "boxes": tokenize_benchmark(box_grid, [box_tokenizer]),
+    "nested": tokenize_benchmark(box_grid, [nested_box_tokenizer]),
+    "templates": tokenize_benchmark(template_diagram, template_tokenizers),
+    "circuit": circuit_benchmark,
+}
+
+# Pathological inputs, excluded unless asked for
+adversarial_benchmarks: Dict[str, Setup] = {
+    "corners": tokenize_benchmark(corner_field, [ascii_box_tokenizer]),
+    "lattice": tokenize_benchmark(corner_lattice, [ascii_box_tokenizer]),
+    "mesh": tokenize_benchmark(dot_mesh, [mesh_tokenizer]),
+}
+
+
+def aborting(run: Callable[[], object]) -> Callable[[], bool]:
+    def run_until_aborted() -> bool:
+        try:
+            run()
+        except BudgetExceeded:
+            return True
+
+        return False
+
+    return run_until_aborted
+
+
+def measure(run: Callable[[], bool], repeat: int, memory: bool):
+    best_time, aborted = min(timed(run) for _ in range(repeat))
+
+    if not memory:
+        return best_time, None, aborted
+
+    start()
+
+    try:
+        run()
+        _, peak_memory = get_traced_memory()
+    finally:
+        stop()
+
+    return best_time, peak_memory, aborted
+
+
+def timed(run: Callable[[], bool]) -> Tuple[float, bool]:
+    start_time = perf_counter()
+    aborted = run()
+
+    return perf_counter() - start_time, aborted
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[2, 4],
+        help="Powers of ten of the number of cells to benchmark",
+    )
+    parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        choices=list(benchmarks) + list(adversarial_benchmarks),
+        default=list(benchmarks),
+    )
+    parser.add_argument(
+        "--adversarial",
+        action="store_true",
+        help="Also run the pathological input benchmarks",
+    )
+    parser.add_argument(
+        "--backends", nargs="+", choices=list(backends), default=["text"]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", dest="memory", action="store_false")
+    parser.add_argument(
+        "--budget-steps",
+        type=int,
+        help="Abort each tokenize call after this many steps of work",
+    )
+    parser.add_argument(
+        "--budget-seconds",
+        type=float,
+        help="Abort each tokenize call after this many seconds",
+    )
+    args = parser.parse_args()
+
+    all_benchmarks = {**benchmarks, **adversarial_benchmarks}
+    names = args.benchmarks
+
+    if args.adversarial:
+        names += [name for name in adversarial_benchmarks if name not in names]
+
+    def budget() -> Optional[WorkBudget]:
+        if args.budget_steps is None and args.budget_seconds is None:
+            return None
+
+        return WorkBudget(steps=args.budget_steps, seconds=args.budget_seconds)
+
+    print(
+        f"{'benchmark':<10} {'backend':<8} {'cells':>9}"
+        f" {'time (s)':>10} {'µs/cell':>8} {'peak (KiB)':>11}"
+    )
+
+    for name in names:
+        for backend in args.backends if name != "circuit" else ["text"]:
+            for scale in args.scales:
+                cells = 10**scale
+                run = aborting(all_benchmarks[name](cells, backend, budget))
+                repeat = args.repeat if scale < 6 else 1
+                time, peak_memory, aborted = measure(run, repeat, args.memory)
+                peak = "-" if peak_memory is None else f"{peak_memory / 1024:.0f}"
+
+                print(
+                    f"{name:<10} {backend:<8} {cells:>9}"
+                    f" {time:>10.4f} {time / cells * 1e6:>8.2f} {peak:>11}"
+                    + (" (aborted)" if aborted else "")
+                )
+
+
+if __name__ == "__main__":
+    main()
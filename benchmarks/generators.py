@@ -0,0 +1,197 @@
+from math import sqrt
+from random import Random
+from typing import List, Tuple
+
+__all__ = [
+    "wire_maze",
+    "box_grid",
+    "template_diagram",
+    "circuit_program",
+    "corner_field",
+    "corner_lattice",
+    "dot_mesh",
+]
+
+
+def dimensions(cells: int) -> Tuple[int, int]:
+    side = max(int(sqrt(cells)), 1)
+
+    return side, max(cells // side, 1)
+
+
+def render(lines: List[List[str]]) -> str:
+    return "\n".join("".join(line).rstrip() for line in lines)
+
+
+def wire_maze(cells: int, seed: int = 0) -> str:
+    """
+    Random mesh of wires on a grid of junctions, with sockets at dead ends
+
+    Wires are drawn with `-`, `|` and `+`, and sockets with `o`.
+    """
+
+    random = Random(seed)
+    width, height = dimensions(cells)
+    lines = [[" "] * width for _ in range(height)]
+
+    for y in range(0, height, 2):
+        for x in range(0, width, 4):
+            lines[y][x] = random.choice("+++o")
+
+            if x + 4 < width and random.random() < 0.6:
+                lines[y][x + 1 : x + 4] = "---"
+
+            if y + 2 < height and random.random() < 0.4:
+                lines[y + 1][x] = "|"
+
+    return render(lines)
+
+
+def box_grid(cells: int, seed: int = 0, nested: bool = True) -> str:
+    """
+    Dense grid of boxes of random sizes, drawn with box drawing characters
+
+    If `nested`, the larger boxes each contain a smaller box.
+    """
+
+    random = Random(seed)
+    width, height = dimensions(cells)
+    lines = [[" "] * width for _ in range(height)]
+
+    def draw_box(min_x: int, min_y: int, max_x: int, max_y: int) -> None:
+        lines[min_y][min_x] = "┌"
+        lines[min_y][max_x] = "┐"
+        lines[max_y][min_x] = "└"
+        lines[max_y][max_x] = "┘"
+
+        for x in range(min_x + 1, max_x):
+            lines[min_y][x] = lines[max_y][x] = "─"
+
+        for y in range(min_y + 1, max_y):
+            lines[y][min_x] = lines[y][max_x] = "│"
+
+    for cell_y in range(0, height - 11, 12):
+        for cell_x in range(0, width - 11, 12):
+            box_width = random.randint(3, 11)
+            box_height = random.randint(3, 11)
+            draw_box(cell_x, cell_y, cell_x + box_width, cell_y + box_height)
+
+            if nested and box_width >= 6 and box_height >= 6:
+                draw_box(
+                    cell_x + 2,
+                    cell_y + 2,
+                    cell_x + box_width - 2,
+                    cell_y + box_height - 2,
+                )
+
+    return render(lines)
+
+
+templates = ["ab\ncd", "<>\n><", "[=]", "(\n)", "#.#\n.#.\n#.#"]
+
+
+def template_diagram(cells: int, seed: int = 0) -> str:
+    """
+    Random placements of the `templates`, each in its own 4 by 4 cell
+    """
+
+    random = Random(seed)
+    width, height = dimensions(cells)
+    lines = [[" "] * width for _ in range(height)]
+
+    for cell_y in range(0, height - 3, 4):
+        for cell_x in range(0, width - 3, 4):
+            if random.random() < 0.2:
+                continue
+
+            template = random.choice(templates)
+
+            for y, line in enumerate(template.splitlines()):
+                for x, symbol in enumerate(line):
+                    lines[cell_y + y][cell_x + x] = symbol
+
+    return render(lines)
+
+
+def circuit_program(cells: int, seed: int = 0) -> str:
+    """
+    Circuit Diagram program of independent two input gates, each followed by a
+    chain of not gates
+    """
+
+    random = Random(seed)
+    width, height = dimensions(cells)
+    chain_length = max(width - 5, 0)
+    blocks = []
+
+    for _ in range(max(height // 4, 1)):
+        gate = random.choice("aAoOxX")
+        chain = "".join(random.choice("~-") for _ in range(chain_length))
+        blocks.append(f"-.\n  {gate}{chain}.:\n-.\n")
+
+    return "\n".join(blocks)
+
+
+def corner_field(cells: int, seed: int = 0) -> str:
+    """
+    Adversarial field of `+` box corners, with a few gaps
+
+    Every corner is a potential start of a box, on every corner edge, and each
+    attempt follows a line of corners before failing.
+    """
+
+    random = Random(seed)
+    width, height = dimensions(cells)
+
+    return render(
+        [
+            [" " if random.random() < 0.01 else "+" for _ in range(width)]
+            for _ in range(height)
+        ]
+    )
+
+
+def corner_lattice(cells: int, seed: int = 0) -> str:
+    """
+    Lattice of boxes drawn with `+`, `-` and `|`, sharing their corners
+
+    Each corner symbol may start any corner edge of a box, so boxes are traced
+    after retries.
+    """
+
+    random = Random(seed)
+    width, height = dimensions(cells)
+    box_width = random.randint(2, 4)
+    box_height = random.randint(1, 3)
+
+    # Trim to whole boxes
+    width = max((width - 1) // (box_width + 1), 1) * (box_width + 1) + 1
+    height = max((height - 1) // (box_height + 1), 1) * (box_height + 1) + 1
+
+    lines = []
+
+    for y in range(height):
+        if y % (box_height + 1) == 0:
+            row = ("+" + "-" * box_width) * width
+        else:
+            row = ("|" + " " * box_width) * width
+
+        lines.append(list(row[:width]))
+
+    return render(lines)
+
+
+def dot_mesh(cells: int, seed: int = 0, density: float = 0.9) -> str:
+    """
+    Adversarial dense mesh of `.` wire segments, connecting in all 8 directions
+    """
+
+    random = Random(seed)
+    width, height = dimensions(cells)
+
+    return render(
+        [
+            ["." if random.random() < density else " " for _ in range(width)]
+            for _ in range(height)
+        ]
+    )
@@ -1,37 +1,82 @@
-from parse_2d.diagram import Diagram, Index
+from parse_2d.diagram import (
+    BaseDiagram,
+    Diagram,
+    DiagramView,
+    Index,
+    MappedDiagram,
+    TextDiagram,
+)
 from parse_2d.regions import RectRegion, Region, SparseRegion, TinyRegion
+from parse_2d.sparse_diagram import SparseDiagram
 from parse_2d.tokens import (
+    AnySymbol,
     BoxTokenizer,
+    BudgetExceeded,
     Directions,
+    IncrementalTokenization,
+    MultiTemplateTokenizer,
+    NestedBoxTokenizer,
+    OneOf,
+    SymbolClass,
     TemplateTokenizer,
     TinyTokenizer,
     Token,
+    TokenizeStats,
     Tokenizer,
+    TokenizerSet,
+    TokenizerStats,
+    TokenTable,
     Translation,
     Wire,
     WireSocket,
     WireTokenizer,
+    WorkBudget,
     tokenize,
+    tokenize_many,
+    tokenize_parallel,
+    tokenize_table,
+    tokenize_with_starts,
 )
 
 __all__ = [
     "Index",
+    "BaseDiagram",
     "Diagram",
+    "DiagramView",
+    "TextDiagram",
+    "MappedDiagram",
+    "SparseDiagram",
     "Region",
     "TinyRegion",
     "RectRegion",
     "SparseRegion",
     "Token",
     "Tokenizer",
+    "TokenizerSet",
     "tokenize",
+    "tokenize_with_starts",
+    "TokenTable",
+    "tokenize_table",
+    "TokenizeStats",
+    "WorkBudget",
+    "BudgetExceeded",
+    "TokenizerStats",
+    "tokenize_parallel",
+    "tokenize_many",
+    "IncrementalTokenization",
     "Translation",
     "Directions",
     "TinyTokenizer",
     "TemplateTokenizer",
+    "SymbolClass",
+    "AnySymbol",
+    "OneOf",
+    "MultiTemplateTokenizer",
     "WireSocket",
     "Wire",
     "WireTokenizer",
     "BoxTokenizer",
+    "NestedBoxTokenizer",
 ]
 
 __version__ = "1.0.0"
@@ -1,7 +1,40 @@
+import re
+from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass, replace
-from typing import Iterable, List, MutableMapping, Tuple, TypeVar, Union
-
-__all__ = ["Index", "Diagram"]
+from functools import lru_cache
+from itertools import count, zip_longest
+from os import PathLike
+from sys import maxsize
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Pattern,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from parse_2d.mapped_lines import MappedLines
+from parse_2d.symbol_index import SymbolIndex
+
+__all__ = [
+    "Index",
+    "BaseDiagram",
+    "Diagram",
+    "DiagramView",
+    "TextDiagram",
+    "MappedDiagram",
+]
 
 V = TypeVar("V")  # Value type
 D = TypeVar("D")  # Default value type
@@ -13,20 +46,223 @@ def char_matrix(s: str) -> List[List[str]]:
     return list(map(list, s.splitlines()))
 
 
+@lru_cache()
+def symbol_runs(whitespace: str) -> Pattern[str]:
+    return re.compile(f"[^{re.escape(whitespace)}]+")
+
+
+class BaseDiagram(MutableMapping[Index, V], metaclass=ABCMeta):
+    """
+    Abstract class for two-dimensional grids of V symbols, with a distinguished
+    whitespace symbol.
+
+    `diagram[index]` returns the symbol at the given index, or whitespace
+    outside of the stored area.
+
+    `diagram[top_left:bottom_right]` returns a view of that rectangle of the
+    diagram, sharing its storage.
+
+    `bounds` returns the corners of a rectangle containing every non-whitespace
+    symbol.
+
+    `items_within(top_left, bottom_right)` returns the indices and non-whitespace
+    symbols within the given rectangle, in row-major order.
+
+    `copy_within(top_left, bottom_right)` returns an independent copy of the
+    given rectangle of the diagram.
+
+    Implementations call `cell_written(index, old_value, new_value)`, or
+    `line_written(y, min_x, old_values, new_values)`, after writing to cells,
+    to keep any derived state, such as the symbol index, the count of
+    non-whitespace symbols, and the cells changed since the last checkpoint, up
+    to date.
+
+    `derive(key, compute)` caches data computed from the diagram's contents,
+    such as the matches of a tokenizer, within a `with diagram.deriving():`
+    block, until the diagram is next written to, or the outermost such block
+    ends. `clear_derived()` drops the cached data without writing to the diagram.
+    """
+
+    whitespace: V
+    symbol_index: Optional[SymbolIndex[V]] = None
+    symbol_count: Optional[int] = None
+    dirty_cells: Optional[Set[Index]] = None
+    derived: Optional[Dict[Hashable, Any]] = None
+    deriving_depth: int = 0
+
+    @abstractmethod
+    def __getitem__(self, item: Index) -> V:
+        raise NotImplementedError
+
+    @abstractmethod
+    def __setitem__(self, key: Index, value: V) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def __delitem__(self, key: Index) -> None:
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def bounds(self) -> Tuple[Index, Index]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def items_within(
+        self, top_left: Index, bottom_right: Index
+    ) -> Iterable[Tuple[Index, V]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def copy_within(self, top_left: Index, bottom_right: Index) -> "BaseDiagram[V]":
+        raise NotImplementedError
+
+    def __iter__(self) -> Iterable[Index]:
+        return self.keys()
+
+    def __len__(self) -> int:
+        if self.symbol_count is None:
+            self.symbol_count = sum(1 for _ in self.items())
+
+        return self.symbol_count
+
+    def __contains__(self, item: Index) -> bool:
+        return self[item] != self.whitespace
+
+    def keys(self) -> Iterable[Index]:
+        for index, item in self.items():
+            yield index
+
+    def items(self) -> Iterable[Tuple[Index, V]]:
+        return self.items_within(*self.bounds)
+
+    def values(self) -> Iterable[V]:
+        for index, item in self.items():
+            yield item
+
+    def get(self, key: Index, default: D = None) -> Union[V, D]:
+        value = self[key]
+
+        if value == self.whitespace:
+            return default
+
+        return value
+
+    def index_symbols(self) -> SymbolIndex[V]:
+        """
+        Build an index from each symbol to its positions, maintained on writes
+        """
+
+        self.symbol_index = SymbolIndex.from_items(self.items(), self.whitespace)
+
+        return self.symbol_index
+
+    def positions_of(self, symbol: V) -> List[Index]:
+        """Indices of the given symbol, in row-major order"""
+
+        if self.symbol_index is not None:
+            return self.symbol_index.positions_of(symbol)
+
+        return [index for index, item in self.items() if item == symbol]
+
+    def checkpoint(self) -> Set[Index]:
+        """
+        Start recording the cells changed by writes, returning the cells changed
+        since the previous checkpoint
+        """
+
+        dirty_cells = self.dirty_cells if self.dirty_cells is not None else set()
+        self.dirty_cells = set()
+
+        return dirty_cells
+
+    @contextmanager
+    def deriving(self) -> Iterator[None]:
+        """
+        Cache derived data within the block, dropping it when the outermost block
+        ends, so it is not kept between tokenize calls
+        """
+
+        self.deriving_depth += 1
+
+        try:
+            yield
+        finally:
+            self.deriving_depth -= 1
+
+            if not self.deriving_depth:
+                self.clear_derived()
+
+    def derive(self, key: Hashable, compute: Callable[[], D]) -> D:
+        """
+        Data computed from the diagram's current contents, cached under the given
+        key if within a `deriving()` block, until the diagram is next written to
+        """
+
+        if not self.deriving_depth:
+            return compute()
+
+        if self.derived is None:
+            self.derived = {}
+
+        try:
+            return self.derived[key]
+        except KeyError:
+            value = self.derived[key] = compute()
+
+            return value
+
+    def clear_derived(self) -> None:
+        self.derived = None
+
+    def cell_written(self, index: Index, old_value: V, new_value: V) -> None:
+        self.clear_derived()
+
+        if self.dirty_cells is not None and old_value != new_value:
+            self.dirty_cells.add(index)
+
+        if self.symbol_count is not None:
+            self.symbol_count += (new_value != self.whitespace) - (
+                old_value != self.whitespace
+            )
+
+        if self.symbol_index is not None:
+            self.symbol_index.replace(index, old_value, new_value)
+
+    def line_written(
+        self, y: int, min_x: int, old_values: Sequence[V], new_values: Sequence[V]
+    ) -> None:
+        self.clear_derived()
+
+        if self.symbol_index is None and self.dirty_cells is None:
+            if self.symbol_count is not None:
+                self.symbol_count += sum(
+                    1 for value in new_values if value != self.whitespace
+                ) - sum(1 for value in old_values if value != self.whitespace)
+
+            return
+
+        for x, (old_value, new_value) in zip(
+            count(min_x),
+            zip_longest(old_values, new_values, fillvalue=self.whitespace),
+        ):
+            self.cell_written((x, y), old_value, new_value)
+
+    def view(self, top_left: Index, bottom_right: Index) -> "DiagramView[V]":
+        return DiagramView(self, top_left, bottom_right)
+
+    def copy(self) -> "BaseDiagram[V]":
+        return self.copy_within(*self.bounds)
+
+
 @dataclass
-class Diagram(MutableMapping[Index, V]):
+class Diagram(BaseDiagram[V]):
     contents: List[List[V]]
     whitespace: V
 
     def __getitem__(self, item: Index) -> V:
         if isinstance(item, slice):
-            min_x, min_y = item.start
-            max_x, max_y = item.stop
-
-            return replace(
-                self,
-                contents=[line[min_x:max_x] for line in self.contents[min_y:max_y]],
-            )
+            return self.view(item.start, item.stop)
 
         x, y = item
 
@@ -43,13 +279,13 @@ class Diagram(MutableMapping[Index, V]):
             if max_y - min_y != len(value):
                 raise IndexError
 
-            for line, replacement_line in zip(
-                self.contents[min_y:max_y], value.contents
+            for y, replacement_line in zip(
+                range(min_y, min(max_y, len(self.contents))), value.contents
             ):
                 if max_x - min_x != len(replacement_line):
                     raise IndexError
 
-                line[min_x:max_x] = replacement_line
+                self.replace_line(y, min_x, max_x, replacement_line)
 
             return
 
@@ -58,15 +294,17 @@ class Diagram(MutableMapping[Index, V]):
         if y < 0 or y >= len(self.contents) or x < 0 or x >= len(self.contents[y]):
             raise IndexError
 
+        old_value = self.contents[y][x]
         self.contents[y][x] = value
+        self.cell_written(key, old_value, value)
 
     def __delitem__(self, key):
         if isinstance(key, slice):
             min_x, min_y = key.start
             max_x, max_y = key.stop
 
-            for line in self.contents[min_y:max_y]:
-                line[min_x:max_x] = [self.whitespace] * (max_x - min_x)
+            for y in range(min_y, min(max_y, len(self.contents))):
+                self.replace_line(y, min_x, max_x, [self.whitespace] * (max_x - min_x))
 
             return
 
@@ -75,20 +313,17 @@ class Diagram(MutableMapping[Index, V]):
         if y < 0 or y >= len(self.contents) or x < 0 or x >= len(self.contents[y]):
             raise IndexError
 
+        old_value = self.contents[y][x]
         self.contents[y][x] = self.whitespace
+        self.cell_written(key, old_value, self.whitespace)
 
-    def __iter__(self) -> Iterable[Index]:
-        return self.keys()
-
-    def __len__(self) -> int:
-        return sum(1 for item in self.values() if item != self.whitespace)
-
-    def __contains__(self, item: Index) -> bool:
-        return self[item] != self.whitespace
-
-    def keys(self) -> Iterable[Index]:
-        for index, item in self.items():
-            yield index
+    def replace_line(
+        self, y: int, min_x: int, max_x: int, replacement: Sequence[V]
+    ) -> None:
+        line = self.contents[y]
+        replaced = line[min_x:max_x]
+        line[min_x:max_x] = replacement
+        self.line_written(y, min_x, replaced, replacement)
 
     def items(self) -> Iterable[Tuple[Index, V]]:
         for y, line in enumerate(self.contents):
@@ -96,18 +331,396 @@ class Diagram(MutableMapping[Index, V]):
                 if item != self.whitespace:
                     yield (x, y), item
 
-    def values(self) -> Iterable[V]:
-        for index, item in self.items():
-            yield item
+    def items_within(
+        self, top_left: Index, bottom_right: Index
+    ) -> Iterable[Tuple[Index, V]]:
+        min_x, min_y = top_left
+        max_x, max_y = bottom_right
 
-    def get(self, key: Index, default: D = None) -> Union[V, D]:
-        value = self[key]
+        for y in range(max(min_y, 0), max_y):
+            try:
+                line = self.contents[y]
+            except IndexError:
+                return
 
-        if value == self.whitespace:
-            return default
+            for x in range(max(min_x, 0), min(max_x, len(line))):
+                item = line[x]
 
-        return value
+                if item != self.whitespace:
+                    yield (x, y), item
+
+    def copy_within(self, top_left: Index, bottom_right: Index) -> "Diagram[V]":
+        min_x, min_y = top_left
+        max_x, max_y = bottom_right
+
+        return replace(
+            self,
+            contents=[line[min_x:max_x] for line in self.contents[min_y:max_y]],
+        )
+
+    @property
+    def bounds(self) -> Tuple[Index, Index]:
+        """
+        Corners of a rectangle containing every non-whitespace symbol, including
+        the top left corner and excluding the bottom right corner
+        """
+
+        width = max(map(len, self.contents), default=0)
+
+        return (0, 0), (width, len(self.contents))
 
     @classmethod
     def from_string(cls, s: str, whitespace: str = " ") -> "Diagram[str]":
         return cls(contents=char_matrix(s), whitespace=whitespace)
+
+    @staticmethod
+    def from_file(
+        path: Union[str, PathLike], whitespace: str = " ", encoding: str = "utf-8"
+    ) -> "MappedDiagram":
+        return MappedDiagram(
+            contents=MappedLines(path, encoding=encoding), whitespace=whitespace
+        )
+
+
+@dataclass(eq=False)
+class DiagramView(BaseDiagram[V]):
+    """
+    View of a rectangle of a parent diagram, sharing its storage
+
+    DiagramView(parent, top_left, bottom_right)
+
+    Indices are relative to `top_left`, and everything outside the rectangle is
+    whitespace. Writes go through to the parent diagram.
+
+    Usually created by slicing a diagram, `diagram[top_left:bottom_right]`.
+    Use `copy()` for an independent diagram.
+    """
+
+    parent: BaseDiagram[V]
+    top_left: Index
+    bottom_right: Index
+
+    def __post_init__(self):
+        if isinstance(self.parent, DiagramView):
+            offset_x, offset_y = self.parent.top_left
+            min_x, min_y = self.parent.clip(self.top_left)
+            max_x, max_y = self.parent.clip(self.bottom_right)
+
+            self.top_left = min_x + offset_x, min_y + offset_y
+            self.bottom_right = max_x + offset_x, max_y + offset_y
+            self.parent = self.parent.parent
+
+    def clip(self, index: Index) -> Index:
+        width, height = self.size
+        x, y = index
+
+        return min(max(x, 0), width), min(max(y, 0), height)
+
+    @property
+    def whitespace(self) -> V:
+        return self.parent.whitespace
+
+    @property
+    def size(self) -> Index:
+        min_x, min_y = self.top_left
+        max_x, max_y = self.bottom_right
+
+        return max(max_x - min_x, 0), max(max_y - min_y, 0)
+
+    def parent_index(self, index: Index) -> Index:
+        x, y = index
+        width, height = self.size
+
+        if x < 0 or x >= width or y < 0 or y >= height:
+            raise IndexError
+
+        return x + self.top_left[0], y + self.top_left[1]
+
+    def __getitem__(self, item: Index) -> V:
+        if isinstance(item, slice):
+            return self.view(item.start, item.stop)
+
+        try:
+            return self.parent[self.parent_index(item)]
+        except IndexError:
+            return self.whitespace
+
+    def __setitem__(self, key: Index, value: V) -> None:
+        if isinstance(key, slice):
+            self.view(key.start, key.stop).replace_with(value)
+            return
+
+        self.parent[self.parent_index(key)] = value
+
+    def __delitem__(self, key: Index) -> None:
+        if isinstance(key, slice):
+            del self.parent[self.view(key.start, key.stop).parent_slice]
+            return
+
+        del self.parent[self.parent_index(key)]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.items())
+
+    def index_symbols(self) -> SymbolIndex[V]:
+        """
+        Build the symbol index of the parent diagram, which views share
+        """
+
+        return self.parent.index_symbols()
+
+    @contextmanager
+    def deriving(self) -> Iterator[None]:
+        """
+        Cache derived data on the parent diagram within the block, dropping what
+        was derived through views of this rectangle in the block when it ends, so
+        tokenizing a view does not leave data on the parent for the rest of an
+        enclosing tokenize call
+        """
+
+        with self.parent.deriving():
+            kept = set(self.parent.derived or ())
+
+            try:
+                yield
+            finally:
+                derived = self.parent.derived
+
+                if derived is not None:
+                    for key in [
+                        key
+                        for key in derived
+                        if key not in kept and self.derived_through(key)
+                    ]:
+                        del derived[key]
+
+    def derived_through(self, key: Hashable) -> bool:
+        return (
+            isinstance(key, tuple)
+            and len(key) == 3
+            and key[1:] == (self.top_left, self.bottom_right)
+        )
+
+    def derive(self, key: Hashable, compute: Callable[[], D]) -> D:
+        """
+        Cached on the parent diagram, as writes to views go through to it
+        """
+
+        return self.parent.derive((key, self.top_left, self.bottom_right), compute)
+
+    def clear_derived(self) -> None:
+        self.parent.clear_derived()
+
+    def positions_of(self, symbol: V) -> List[Index]:
+        if self.parent.symbol_index is None:
+            return super().positions_of(symbol)
+
+        offset_x, offset_y = self.top_left
+        width, height = self.size
+
+        return [
+            (x - offset_x, y - offset_y)
+            for x, y in self.parent.symbol_index.positions_of(symbol)
+            if 0 <= x - offset_x < width and 0 <= y - offset_y < height
+        ]
+
+    @property
+    def parent_slice(self) -> slice:
+        return slice(self.top_left, self.bottom_right)
+
+    def replace_with(self, value: BaseDiagram[V]) -> None:
+        self.parent[self.parent_slice] = value
+
+    @property
+    def bounds(self) -> Tuple[Index, Index]:
+        return (0, 0), self.size
+
+    def items_within(
+        self, top_left: Index, bottom_right: Index
+    ) -> Iterable[Tuple[Index, V]]:
+        offset_x, offset_y = self.top_left
+        min_x, min_y = self.clip(top_left)
+        max_x, max_y = self.clip(bottom_right)
+
+        for (x, y), item in self.parent.items_within(
+            (min_x + offset_x, min_y + offset_y), (max_x + offset_x, max_y + offset_y)
+        ):
+            yield (x - offset_x, y - offset_y), item
+
+    def copy_within(self, top_left: Index, bottom_right: Index) -> BaseDiagram[V]:
+        return self[top_left:bottom_right].copy()
+
+    def copy(self) -> BaseDiagram[V]:
+        return self.parent.copy_within(self.top_left, self.bottom_right)
+
+    @property
+    def contents(self):
+        return self.copy().contents
+
+
+@dataclass
+class TextDiagram(Diagram[str]):
+    """
+    Diagram of single character symbols, stored compactly as one string per row
+
+    TextDiagram(contents, whitespace)
+
+    Rows are immutable strings, so each cell costs one to four bytes, rather
+    than a pointer to a separate string object. Reading a cell is a single
+    string index, while writing a cell rebuilds its row.
+    """
+
+    contents: List[str]
+
+    def __getitem__(self, item: Index) -> str:
+        if isinstance(item, slice):
+            return super().__getitem__(item)
+
+        x, y = item
+
+        if x < 0 or y < 0:
+            return self.whitespace
+
+        try:
+            line = self.contents[y]
+        except IndexError:
+            return self.whitespace
+
+        if x < len(line):
+            return line[x]
+
+        return self.whitespace
+
+    def __setitem__(self, key: Index, value: str) -> None:
+        if isinstance(key, slice):
+            min_x, min_y = key.start
+            max_x, max_y = key.stop
+
+            if max_y - min_y != len(value.contents):
+                raise IndexError
+
+            for y, replacement_line in zip(range(min_y, max_y), value.contents):
+                if max_x - min_x != len(replacement_line):
+                    raise IndexError
+
+                self.replace_line(y, min_x, max_x, "".join(replacement_line))
+
+            return
+
+        x, y = key
+
+        if y < 0 or y >= len(self.contents) or x < 0 or x >= len(self.contents[y]):
+            raise IndexError
+
+        self.replace_line(y, x, x + 1, value)
+
+    def __delitem__(self, key):
+        if isinstance(key, slice):
+            min_x, min_y = key.start
+            max_x, max_y = key.stop
+
+            for y in range(min_y, min(max_y, len(self.contents))):
+                self.replace_line(y, min_x, max_x, self.whitespace * (max_x - min_x))
+
+            return
+
+        x, y = key
+
+        if y < 0 or y >= len(self.contents) or x < 0 or x >= len(self.contents[y]):
+            raise IndexError
+
+        self.replace_line(y, x, x + 1, self.whitespace)
+
+    def items(self) -> Iterable[Tuple[Index, str]]:
+        return self.items_within((0, 0), (maxsize, maxsize))
+
+    def items_within(
+        self, top_left: Index, bottom_right: Index
+    ) -> Iterable[Tuple[Index, str]]:
+        """
+        Lines that are mostly whitespace are searched for runs of symbols by
+        regex, while denser lines are faster to step through directly.
+        """
+
+        min_x, min_y = top_left
+        max_x, max_y = bottom_right
+        min_x = max(min_x, 0)
+        whitespace = self.whitespace
+        runs = symbol_runs(whitespace)
+
+        for y in range(max(min_y, 0), max_y):
+            try:
+                line = self.contents[y]
+            except IndexError:
+                return
+
+            line_length = max(min(max_x, len(line)) - min_x, 0)
+            symbol_count = line_length - line.count(whitespace, min_x, max_x)
+
+            if symbol_count * 16 > line_length:
+                for x, item in enumerate(line[min_x:max_x], min_x):
+                    if item != whitespace:
+                        yield (x, y), item
+
+                continue
+
+            for match in runs.finditer(line, min_x, max_x):
+                start, stop = match.span()
+
+                for x in range(start, stop):
+                    yield (x, y), line[x]
+
+    def replace_line(self, y: int, min_x: int, max_x: int, replacement: str) -> None:
+        if not isinstance(replacement, str) or len(replacement) != max_x - min_x:
+            raise TypeError(f"{type(self).__name__} symbols must be single characters")
+
+        line = self.contents[y]
+        self.contents[y] = line[:min_x] + replacement + line[max_x:]
+        self.line_written(y, min_x, line[min_x:max_x], replacement)
+
+    @classmethod
+    def from_string(cls, s: str, whitespace: str = " ") -> "TextDiagram":
+        return cls(contents=s.splitlines(), whitespace=whitespace)
+
+
+@dataclass
+class MappedDiagram(TextDiagram):
+    """
+    TextDiagram of a memory mapped file, decoding rows only when accessed
+
+    MappedDiagram(contents, whitespace)
+
+    Usually created with `Diagram.from_file(path)`.
+    """
+
+    contents: MappedLines
+
+    def copy_within(self, top_left: Index, bottom_right: Index) -> TextDiagram:
+        min_x, min_y = top_left
+        max_x, max_y = bottom_right
+
+        return TextDiagram(
+            contents=[line[min_x:max_x] for line in self.contents[min_y:max_y]],
+            whitespace=self.whitespace,
+        )
+
+    @property
+    def bounds(self) -> Tuple[Index, Index]:
+        """
+        Corners of a rectangle containing every non-whitespace symbol
+
+        The width is measured in bytes, so may be wider than the longest row.
+        """
+
+        self.contents.index_all()
+
+        return (0, 0), (self.contents.max_line_bytes, len(self.contents))
+
+    def close(self) -> None:
+        self.contents.close()
+
+    def __enter__(self) -> "MappedDiagram":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,150 @@
+import mmap
+from array import array
+from collections import OrderedDict
+from os import PathLike
+from os.path import abspath
+from typing import Dict, List, Sequence, Union, overload
+
+__all__ = ["MappedLines"]
+
+
+class MappedLines(Sequence[str]):
+    """
+    The lines of a file, decoded lazily from a memory map
+
+    MappedLines(path, encoding="utf-8", cache_size=1024)
+
+    Only the start offsets of the lines seen so far are held in memory. The
+    offsets are found on demand, and each line is decoded when it is accessed,
+    keeping the `cache_size` most recently used lines.
+
+    Lines are separated by "\\n", with any trailing "\\r" removed.
+    Lines may be replaced, in which case the replacement is held in memory.
+
+    Pickling keeps the path and replacements, rather than the contents, so the
+    file is mapped again when unpickled, such as in another process.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, PathLike],
+        encoding: str = "utf-8",
+        cache_size: int = 1024,
+    ):
+        self.path = abspath(path)
+        self.encoding = encoding
+        self.cache_size = cache_size
+
+        with open(path, "rb") as file:
+            self.size = file.seek(0, 2)
+            self.map = (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                if self.size
+                else b""
+            )
+
+        self.offsets = array("Q", [0])
+        self.is_indexed = self.size == 0
+        self.max_line_bytes = 0
+        self.replacements: Dict[int, str] = {}
+        self.cache: "OrderedDict[int, str]" = OrderedDict()
+
+    def __reduce__(self):
+        return (
+            type(self),
+            (self.path, self.encoding, self.cache_size),
+            {"replacements": self.replacements},
+        )
+
+    def index_until(self, line_number: int) -> None:
+        offsets = self.offsets
+
+        while not self.is_indexed and len(offsets) <= line_number + 1:
+            start = offsets[-1]
+            newline = self.map.find(b"\n", start)
+
+            if newline == -1:
+                self.is_indexed = True
+                self.max_line_bytes = max(self.max_line_bytes, self.size - start)
+            else:
+                offsets.append(newline + 1)
+                self.max_line_bytes = max(self.max_line_bytes, newline - start)
+
+    def index_all(self) -> None:
+        self.index_until(self.size)
+
+    def line_count(self) -> int:
+        if self.offsets[-1] == self.size:
+            return len(self.offsets) - 1
+
+        return len(self.offsets)
+
+    def __len__(self) -> int:
+        self.index_all()
+
+        return self.line_count()
+
+    @overload
+    def __getitem__(self, item: int) -> str: ...
+
+    @overload
+    def __getitem__(self, item: slice) -> List[str]: ...
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+
+        if item < 0:
+            item += len(self)
+
+        if item in self.replacements:
+            return self.replacements[item]
+
+        if item in self.cache:
+            self.cache.move_to_end(item)
+            return self.cache[item]
+
+        self.index_until(item)
+
+        if item < 0 or item >= self.line_count():
+            raise IndexError("line index out of range")
+
+        line = self.decode(item)
+
+        self.cache[item] = line
+
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+        return line
+
+    def __setitem__(self, item: int, line: str) -> None:
+        if item < 0:
+            item += len(self)
+
+        self.index_until(item)
+
+        if item < 0 or item >= self.line_count():
+            raise IndexError("line assignment index out of range")
+
+        self.cache.pop(item, None)
+        self.replacements[item] = line
+
+    def decode(self, line_number: int) -> str:
+        start = self.offsets[line_number]
+
+        if line_number + 1 < len(self.offsets):
+            end = self.offsets[line_number + 1] - 1
+        else:
+            end = self.size
+
+        line = self.map[start:end]
+
+        if line.endswith(b"\r"):
+            line = line[:-1]
+
+        return line.decode(self.encoding)
+
+    def close(self) -> None:
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
@@ -21,6 +21,9 @@ class TinyRegion(Region):
     def __len__(self):
         return 1
 
+    def __reduce__(self):
+        return type(self), (self.location,)
+
 
 @dataclass(frozen=True)
 class RectRegion(Region):
@@ -48,6 +51,9 @@ class RectRegion(Region):
 
         return (max_y - min_y) * (max_x - min_x)
 
+    def __reduce__(self):
+        return type(self), (self.top_left, self.bottom_right)
+
 
 @dataclass(frozen=True)
 class SparseRegion(Region):
@@ -61,3 +67,6 @@ class SparseRegion(Region):
 
     def __len__(self):
         return len(self.contents)
+
+    def __reduce__(self):
+        return type(self), (self.contents,)
@@ -0,0 +1,192 @@
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Dict, Iterable, List, Tuple, TypeVar
+
+from parse_2d.diagram import BaseDiagram, Index
+
+__all__ = ["SparseDiagram"]
+
+V = TypeVar("V")  # Value type
+
+TileIndex = Tuple[int, int]
+
+
+@dataclass(eq=False)
+class SparseDiagram(BaseDiagram[V]):
+    """
+    Diagram storing only the square tiles that contain non-whitespace symbols
+
+    SparseDiagram(whitespace, tile_size=32)
+
+    Tiles are allocated on the first write of a non-whitespace symbol, and
+    released once they contain only whitespace again, so memory use and
+    iteration time scale with the content of the diagram, rather than its
+    bounding box. Indices may be any pair of integers, including negatives.
+    """
+
+    whitespace: V
+    tile_size: int = 32
+    tiles: Dict[TileIndex, List[V]] = field(default_factory=dict, repr=False)
+    tile_counts: Dict[TileIndex, int] = field(default_factory=dict, repr=False)
+
+    def locate(self, index: Index) -> Tuple[TileIndex, int]:
+        x, y = index
+        tile_x, offset_x = divmod(x, self.tile_size)
+        tile_y, offset_y = divmod(y, self.tile_size)
+
+        return (tile_x, tile_y), offset_y * self.tile_size + offset_x
+
+    def __getitem__(self, item: Index) -> V:
+        if isinstance(item, slice):
+            return self.view(item.start, item.stop)
+
+        tile_index, offset = self.locate(item)
+        tile = self.tiles.get(tile_index)
+
+        if tile is None:
+            return self.whitespace
+
+        return tile[offset]
+
+    def __setitem__(self, key: Index, value: V) -> None:
+        if isinstance(key, slice):
+            min_x, min_y = key.start
+            max_x, max_y = key.stop
+
+            for y in range(min_y, max_y):
+                for x in range(min_x, max_x):
+                    self[(x, y)] = value[(x - min_x, y - min_y)]
+
+            return
+
+        if value == self.whitespace:
+            del self[key]
+            return
+
+        tile_index, offset = self.locate(key)
+        tile = self.tiles.get(tile_index)
+
+        if tile is None:
+            tile = self.tiles[tile_index] = [self.whitespace] * self.tile_size**2
+            self.tile_counts[tile_index] = 0
+
+        old_value = tile[offset]
+
+        if old_value == self.whitespace:
+            self.tile_counts[tile_index] += 1
+
+        tile[offset] = value
+        self.cell_written(key, old_value, value)
+
+    def __delitem__(self, key: Index) -> None:
+        if isinstance(key, slice):
+            for index, _ in list(self.items_within(key.start, key.stop)):
+                del self[index]
+
+            return
+
+        tile_index, offset = self.locate(key)
+        tile = self.tiles.get(tile_index)
+
+        if tile is None or tile[offset] == self.whitespace:
+            return
+
+        old_value = tile[offset]
+        tile[offset] = self.whitespace
+        self.tile_counts[tile_index] -= 1
+        self.cell_written(key, old_value, self.whitespace)
+
+        if not self.tile_counts[tile_index]:
+            del self.tiles[tile_index]
+            del self.tile_counts[tile_index]
+
+    @property
+    def bounds(self) -> Tuple[Index, Index]:
+        if not self.tiles:
+            return (0, 0), (0, 0)
+
+        tile_xs = [tile_x for tile_x, _ in self.tiles]
+        tile_ys = [tile_y for _, tile_y in self.tiles]
+
+        return (
+            (min(tile_xs) * self.tile_size, min(tile_ys) * self.tile_size),
+            ((max(tile_xs) + 1) * self.tile_size, (max(tile_ys) + 1) * self.tile_size),
+        )
+
+    def items_within(
+        self, top_left: Index, bottom_right: Index
+    ) -> Iterable[Tuple[Index, V]]:
+        min_x, min_y = top_left
+        max_x, max_y = bottom_right
+        size = self.tile_size
+        whitespace = self.whitespace
+
+        tile_indices = sorted(
+            (tile_y, tile_x)
+            for tile_x, tile_y in self.tiles
+            if min_x < (tile_x + 1) * size
+            and tile_x * size < max_x
+            and min_y < (tile_y + 1) * size
+            and tile_y * size < max_y
+        )
+
+        for tile_y, tile_row in groupby(tile_indices, key=lambda index: index[0]):
+            tile_row = [
+                (tile_x * size, self.tiles[(tile_x, tile_y)]) for _, tile_x in tile_row
+            ]
+
+            for y in range(max(min_y, tile_y * size), min(max_y, (tile_y + 1) * size)):
+                row_offset = (y - tile_y * size) * size
+
+                for tile_min_x, tile in tile_row:
+                    start = max(min_x - tile_min_x, 0)
+                    stop = min(max_x - tile_min_x, size)
+
+                    for offset_x in range(start, stop):
+                        item = tile[row_offset + offset_x]
+
+                        if item != whitespace:
+                            yield (tile_min_x + offset_x, y), item
+
+    def copy_within(self, top_left: Index, bottom_right: Index) -> "SparseDiagram[V]":
+        min_x, min_y = top_left
+        copy = SparseDiagram(self.whitespace, self.tile_size)
+
+        for (x, y), item in self.items_within(top_left, bottom_right):
+            copy[(x - min_x, y - min_y)] = item
+
+        return copy
+
+    def copy(self) -> "SparseDiagram[V]":
+        return SparseDiagram(
+            self.whitespace,
+            self.tile_size,
+            {tile_index: list(tile) for tile_index, tile in self.tiles.items()},
+            dict(self.tile_counts),
+        )
+
+    @classmethod
+    def from_items(
+        cls, items: Iterable[Tuple[Index, V]], whitespace: V, tile_size: int = 32
+    ) -> "SparseDiagram[V]":
+        diagram = cls(whitespace, tile_size)
+
+        for index, item in items:
+            diagram[index] = item
+
+        return diagram
+
+    @classmethod
+    def from_string(
+        cls, s: str, whitespace: str = " ", tile_size: int = 32
+    ) -> "SparseDiagram[str]":
+        return cls.from_items(
+            (
+                ((x, y), item)
+                for y, line in enumerate(s.splitlines())
+                for x, item in enumerate(line)
+                if item != whitespace
+            ),
+            whitespace,
+            tile_size,
+        )
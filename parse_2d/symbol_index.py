@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+from heapq import merge
+from typing import Dict, Generic, Iterable, List, Set, Tuple, TypeVar
+
+__all__ = ["SymbolIndex"]
+
+V = TypeVar("V")  # Value type
+
+Index = Tuple[int, int]
+
+
+def row_major(index: Index) -> Index:
+    x, y = index
+
+    return y, x
+
+
+@dataclass
+class SymbolIndex(Generic[V]):
+    """
+    Inverted index from each non-whitespace symbol of a diagram, to the set of
+    indices it occurs at
+
+    SymbolIndex(whitespace)
+
+    `positions_of(symbol)` returns the indices of the symbol, in row-major
+    order. Sorted positions are cached until the symbol is next written.
+    """
+
+    whitespace: V
+    positions: Dict[V, Set[Index]] = field(default_factory=dict, repr=False)
+    sorted_positions: Dict[V, List[Index]] = field(default_factory=dict, repr=False)
+
+    def add(self, index: Index, symbol: V) -> None:
+        if symbol == self.whitespace:
+            return
+
+        self.positions.setdefault(symbol, set()).add(index)
+        self.sorted_positions.pop(symbol, None)
+
+    def remove(self, index: Index, symbol: V) -> None:
+        if symbol == self.whitespace:
+            return
+
+        positions = self.positions.get(symbol)
+
+        if positions is None:
+            return
+
+        positions.discard(index)
+        self.sorted_positions.pop(symbol, None)
+
+        if not positions:
+            del self.positions[symbol]
+
+    def replace(self, index: Index, old_symbol: V, new_symbol: V) -> None:
+        if old_symbol != new_symbol:
+            self.remove(index, old_symbol)
+            self.add(index, new_symbol)
+
+    def positions_of(self, symbol: V) -> List[Index]:
+        sorted_positions = self.sorted_positions.get(symbol)
+
+        if sorted_positions is None:
+            sorted_positions = sorted(self.positions.get(symbol, ()), key=row_major)
+            self.sorted_positions[symbol] = sorted_positions
+
+        return sorted_positions
+
+    def items(self, symbols: Iterable[V]) -> Iterable[Tuple[Index, V]]:
+        """
+        Indices and symbols of every occurrence of the given symbols, in
+        row-major order
+        """
+
+        return merge(
+            *(
+                [(index, symbol) for index in self.positions_of(symbol)]
+                for symbol in symbols
+                if symbol in self.positions
+            ),
+            key=lambda item: row_major(item[0]),
+        )
+
+    @classmethod
+    def from_items(
+        cls, items: Iterable[Tuple[Index, V]], whitespace: V
+    ) -> "SymbolIndex[V]":
+        symbol_index = cls(whitespace)
+
+        for index, symbol in items:
+            symbol_index.add(index, symbol)
+
+        return symbol_index
@@ -1,20 +1,50 @@
 from parse_2d.tokens.box_tokenizer import BoxTokenizer
+from parse_2d.tokens.budget import BudgetExceeded, WorkBudget
+from parse_2d.tokens.incremental import IncrementalTokenization
+from parse_2d.tokens.multi_template_tokenizer import MultiTemplateTokenizer
+from parse_2d.tokens.nested_box_tokenizer import NestedBoxTokenizer
+from parse_2d.tokens.parallel import tokenize_many, tokenize_parallel
+from parse_2d.tokens.stats import TokenizeStats, TokenizerStats
+from parse_2d.tokens.symbol_classes import AnySymbol, OneOf, SymbolClass
+from parse_2d.tokens.table import TokenTable, tokenize_table
 from parse_2d.tokens.template_tokenizer import TemplateTokenizer
 from parse_2d.tokens.tiny_tokenizer import TinyTokenizer
 from parse_2d.tokens.translation import Directions, Translation
-from parse_2d.tokens.types import Token, Tokenizer, tokenize
+from parse_2d.tokens.types import (
+    Token,
+    Tokenizer,
+    TokenizerSet,
+    tokenize,
+    tokenize_with_starts,
+)
 from parse_2d.tokens.wire_tokenizer import Wire, WireSocket, WireTokenizer
 
 __all__ = [
     "Token",
     "Tokenizer",
+    "TokenizerSet",
     "tokenize",
+    "tokenize_with_starts",
+    "TokenTable",
+    "tokenize_table",
+    "TokenizeStats",
+    "WorkBudget",
+    "BudgetExceeded",
+    "TokenizerStats",
+    "tokenize_parallel",
+    "tokenize_many",
+    "IncrementalTokenization",
     "Translation",
     "Directions",
     "TinyTokenizer",
     "TemplateTokenizer",
+    "SymbolClass",
+    "AnySymbol",
+    "OneOf",
+    "MultiTemplateTokenizer",
     "WireSocket",
     "Wire",
     "WireTokenizer",
     "BoxTokenizer",
+    "NestedBoxTokenizer",
 ]
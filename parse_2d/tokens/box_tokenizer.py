@@ -1,10 +1,21 @@
-from dataclasses import dataclass
-from typing import Callable, FrozenSet, Mapping, TypeVar
+from dataclasses import dataclass, field
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
 from more_properties import cached_property
 
-from parse_2d.diagram import Diagram, Index
+from parse_2d.diagram import BaseDiagram, Diagram, Index
 from parse_2d.regions import RectRegion
+from parse_2d.tokens.budget import current_budget
+from parse_2d.tokens.stats import record
 from parse_2d.tokens.translation import Directions, Translation
 from parse_2d.tokens.types import Token, Tokenizer
 
@@ -41,6 +52,40 @@ next_edge = {
 }
 
 
+# The edges of a box, in the order they are traced
+edge_cycle = [
+    Directions.UP,
+    Directions.UP_RIGHT,
+    Directions.RIGHT,
+    Directions.DOWN_RIGHT,
+    Directions.DOWN,
+    Directions.DOWN_LEFT,
+    Directions.LEFT,
+    Directions.UP_LEFT,
+]
+
+
+@dataclass
+class BoxTables:
+    """
+    Tables of work done tracing boxes in a diagram, for each edge, by its
+    position in `edge_cycle`
+
+    `line_ends[edge]` maps a cell to the cell after the end of the line of that
+    edge's symbols, starting from that cell, in the edge's search direction.
+
+    `failed_traces[edge]` maps a cell a trace of that edge has failed from, to
+    the number of edges followed before it failed.
+    """
+
+    line_ends: List[Dict[Index, Index]] = field(
+        default_factory=lambda: [{} for _ in edge_cycle]
+    )
+    failed_traces: List[Dict[Index, int]] = field(
+        default_factory=lambda: [{} for _ in edge_cycle]
+    )
+
+
 @dataclass(frozen=True)
 class BoxTokenizer(Tokenizer[ST, VT]):
     """
@@ -52,12 +97,16 @@ class BoxTokenizer(Tokenizer[ST, VT]):
     symbols that may be used for that edge.
 
     `contents_tokenizer` is a function to determine the value of the extracted
-    token, and is passed the entire box (including the edge) as its only
-    parameter.
+    token, and is passed a view of the entire box (including the edge) as its
+    only parameter.
+
+    The lines of edge symbols, and the cells boxes fail to be traced from, are
+    cached on the diagram for the rest of the tokenize call, so each line is only
+    followed once, and each failed trace is not repeated.
     """
 
     edge_symbols: Mapping[Directions, FrozenSet[ST]]
-    contents_tokenizer: Callable[[Diagram[ST]], VT]
+    contents_tokenizer: Callable[[BaseDiagram[ST]], VT]
 
     @cached_property
     def symbols(self):
@@ -66,6 +115,34 @@ class BoxTokenizer(Tokenizer[ST, VT]):
     def starts_on(self, symbol: ST) -> bool:
         return symbol in self.symbols
 
+    def start_symbols(self) -> FrozenSet[ST]:
+        return self.symbols
+
+    def reach(self) -> Optional[int]:
+        if sum(map(len, self.edge_symbols.values())) != len(self.symbols):
+            # Edges sharing symbols may be traced from outside of the box
+            return None
+
+        return 1
+
+    @cached_property
+    def cache_key(self) -> object:
+        return object()
+
+    @cached_property
+    def edge_lines(self) -> List[Tuple[FrozenSet[ST], Translation]]:
+        """
+        The symbols and search direction of each edge, in `edge_cycle` order
+        """
+
+        return [
+            (self.edge_symbols.get(edge, frozenset()), search_directions[edge])
+            for edge in edge_cycle
+        ]
+
+    def tables(self, diagram: BaseDiagram[ST]) -> BoxTables:
+        return diagram.derive(self.cache_key, BoxTables)
+
     @staticmethod
     def follow_line(
         diagram: Diagram[ST],
@@ -73,26 +150,105 @@ class BoxTokenizer(Tokenizer[ST, VT]):
         line_symbols: FrozenSet[ST],
         direction: Translation,
     ) -> Index:
+        budget = current_budget.get()
+
         while diagram[index] in line_symbols:
             index += direction
 
+            if budget is not None:
+                budget.spend()
+
         return index
 
+    def line_end(
+        self, diagram: Diagram[ST], tables: BoxTables, index: Index, edge: int
+    ) -> Index:
+        """
+        As `follow_line`, for the symbols and search direction of the edge at the
+        given position in `edge_cycle`, filling the diagram's table of line ends
+        for every cell of the line
+        """
+
+        line_ends = tables.line_ends[edge]
+
+        try:
+            return line_ends[index]
+        except KeyError:
+            pass
+
+        line_symbols, direction = self.edge_lines[edge]
+        x, y = index
+        line = []
+
+        while True:
+            end = line_ends.get((x, y))
+
+            if end is not None:
+                break
+
+            if diagram[x, y] not in line_symbols:
+                end = x, y
+                break
+
+            line.append((x, y))
+            x += direction.x
+            y += direction.y
+
+        budget = current_budget.get()
+
+        if budget is not None:
+            budget.spend(len(line))
+
+        for cell in line:
+            line_ends[cell] = end
+
+        return end
+
     def trace_box(self, diagram: Diagram[ST], index: Index, starting_edge: Directions):
-        current_edge = starting_edge
+        top_left, bottom_right = self.trace_rect(diagram, index, starting_edge)
+
+        return Token(
+            RectRegion(top_left, bottom_right),
+            self.contents_tokenizer(diagram[top_left:bottom_right]),
+        )
+
+    def trace_rect(
+        self, diagram: Diagram[ST], index: Index, starting_edge: Directions
+    ) -> Tuple[Index, Index]:
+        """
+        The top left and bottom right corners of the box traced from the given
+        cell, on the given edge, raising TypeError if there is none
+        """
+
+        starting_position = edge_cycle.index(starting_edge)
+        edge_lines = self.edge_lines
+        tables = self.tables(diagram)
 
         min_x, min_y = index
         max_x, max_y = index
 
-        for _ in range(8):
-            direction = search_directions[current_edge]
+        trace = []
+
+        for step in range(8):
+            edge = (starting_position + step) % 8
+
+            # A trace failing from this state within the remaining steps fails
+            # from the start too
+            failed_after = tables.failed_traces[edge].get(index)
+
+            if failed_after is not None and step + failed_after < 8:
+                self.trace_failed(tables, trace, step + failed_after)
+
+            end = tables.line_ends[edge].get(index)
 
-            if diagram[index] not in self.edge_symbols[current_edge]:
-                raise TypeError()
+            if end is None:
+                if diagram[index] not in edge_lines[edge][0]:
+                    self.trace_failed(tables, trace, step)
 
-            index = self.follow_line(
-                diagram, index, self.edge_symbols[current_edge], direction
-            )
+                end = self.line_end(diagram, tables, index, edge)
+
+            trace.append((index, edge))
+            index = end
 
             x, y = index
 
@@ -101,25 +257,24 @@ class BoxTokenizer(Tokenizer[ST, VT]):
             max_x = max(x, max_x)
             max_y = max(y, max_y)
 
-            current_edge = next_edge[current_edge]
+        return (min_x, min_y), (max_x, max_y) + Directions.DOWN_RIGHT.value
 
-        top_left = min_x, min_y
-        bottom_right = (max_x, max_y) + Directions.DOWN_RIGHT.value
+    @staticmethod
+    def trace_failed(tables: BoxTables, trace: List[Tuple[Index, int]], steps: int):
+        for step, (index, edge) in enumerate(trace):
+            tables.failed_traces[edge][index] = steps - step
 
-        return Token(
-            RectRegion(top_left, bottom_right),
-            self.contents_tokenizer(diagram[top_left:bottom_right]),
-        )
+        raise TypeError()
 
     def extract_token(self, diagram: Diagram[ST], index: Index) -> Token[VT]:
+        symbol = diagram[index]
         potential_starting_edges = (
-            edge
-            for edge, symbols in self.edge_symbols.items()
-            if diagram[index] in symbols
+            edge for edge, symbols in self.edge_symbols.items() if symbol in symbols
         )
 
         for potential_starting_edge in potential_starting_edges:
             try:
                 return self.trace_box(diagram, index, potential_starting_edge)
             except TypeError:
+                record(self, "trace_box_retries")
                 continue
@@ -0,0 +1,61 @@
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Optional
+
+from parse_2d.tokens.thread_value import ThreadValue
+
+__all__ = ["BudgetExceeded", "WorkBudget"]
+
+TIME_CHECK_INTERVAL = 1024
+
+
+class BudgetExceeded(Exception):
+    """Raised by `tokenize` when its work budget has been spent"""
+
+
+@dataclass
+class WorkBudget:
+    """
+    A limit on the work `tokenize` may do, for bounded latency parsing of
+    untrusted diagrams
+
+    WorkBudget(steps=None, seconds=None)
+
+    `steps` limits the total number of steps, such as cells scanned, and wire
+    segments or box edges followed, by the tokenizers.
+
+    `seconds` limits the wall time, from the first time the budget is used.
+
+    `spend(steps)` records the given number of steps of work, raising
+    `BudgetExceeded` if either limit has been exceeded. The time is checked
+    every `TIME_CHECK_INTERVAL` steps.
+
+    The same budget may be passed to many calls of `tokenize`, to limit their
+    combined work.
+    """
+
+    steps: Optional[int] = None
+    seconds: Optional[float] = None
+    steps_taken: int = 0
+    deadline: Optional[float] = field(default=None, repr=False)
+    next_time_check: int = field(default=0, repr=False)
+
+    def start(self) -> None:
+        if self.seconds is not None and self.deadline is None:
+            self.deadline = perf_counter() + self.seconds
+
+    def spend(self, steps: int = 1) -> None:
+        self.steps_taken += steps
+
+        if self.steps is not None and self.steps_taken > self.steps:
+            raise BudgetExceeded(f"Exceeded budget of {self.steps} steps")
+
+        if self.deadline is not None and self.steps_taken >= self.next_time_check:
+            self.next_time_check = self.steps_taken + TIME_CHECK_INTERVAL
+
+            if perf_counter() > self.deadline:
+                raise BudgetExceeded(f"Exceeded budget of {self.seconds} seconds")
+
+
+# The budget of the `tokenize` call currently extracting a token
+current_budget = ThreadValue()
@@ -0,0 +1,66 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Tuple
+
+from parse_2d.diagram import Index
+from parse_2d.regions import RectRegion, Region
+
+__all__ = ["Coverage"]
+
+CHUNK_BITS = 10
+CHUNK_WIDTH = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK_WIDTH - 1
+
+
+@dataclass
+class Coverage:
+    """
+    Bitmap of the cells covered by tokens
+
+    Coverage()
+
+    The bitmap is split into horizontal chunks of `CHUNK_WIDTH` cells, each
+    allocated when a cell within it is first covered, so memory use scales with
+    the area covered, rather than the size of the diagram.
+    """
+
+    chunks: Dict[Tuple[int, int], bytearray] = field(default_factory=dict, repr=False)
+
+    def __contains__(self, item: Index) -> bool:
+        x, y = item
+        chunk = self.chunks.get((y, x >> CHUNK_BITS))
+
+        return chunk is not None and chunk[x & CHUNK_MASK] == 1
+
+    def chunk(self, y: int, chunk_x: int) -> bytearray:
+        chunk = self.chunks.get((y, chunk_x))
+
+        if chunk is None:
+            chunk = self.chunks[(y, chunk_x)] = bytearray(CHUNK_WIDTH)
+
+        return chunk
+
+    def add(self, region: Region) -> None:
+        if isinstance(region, RectRegion):
+            self.add_rect(region.top_left, region.bottom_right)
+        else:
+            self.add_cells(region)
+
+    def add_cells(self, cells: Iterable[Index]) -> None:
+        for x, y in cells:
+            self.chunk(y, x >> CHUNK_BITS)[x & CHUNK_MASK] = 1
+
+    def add_rect(self, top_left: Index, bottom_right: Index) -> None:
+        min_x, min_y = top_left
+        max_x, max_y = bottom_right
+
+        for chunk_x in range(min_x >> CHUNK_BITS, (max_x - 1 >> CHUNK_BITS) + 1):
+            start = max(min_x - (chunk_x << CHUNK_BITS), 0)
+            stop = min(max_x - (chunk_x << CHUNK_BITS), CHUNK_WIDTH)
+
+            if start >= stop:
+                continue
+
+            covered = b"\x01" * (stop - start)
+
+            for y in range(min_y, max_y):
+                self.chunk(y, chunk_x)[start:stop] = covered
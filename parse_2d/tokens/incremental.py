@@ -0,0 +1,205 @@
+from dataclasses import dataclass, field
+from heapq import heapify, heappop, heappush
+from typing import (
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from parse_2d.diagram import BaseDiagram, Index
+from parse_2d.tokens.types import (
+    Token,
+    Tokenizer,
+    TokenizerSet,
+    missing_token,
+    tokenize_with_starts,
+)
+
+__all__ = ["IncrementalTokenization"]
+
+ST = TypeVar("ST")  # Symbol type
+VT = TypeVar("VT")  # Token value type
+
+
+def row_major(index: Index) -> Tuple[int, int]:
+    x, y = index
+
+    return y, x
+
+
+@dataclass
+class IncrementalTokenization(Generic[ST, VT]):
+    """
+    The tokens of a diagram, kept up to date as the diagram is edited.
+
+    IncrementalTokenization.tokenize(diagram, tokenizers)
+
+    Tokenizes the diagram, and starts recording the cells changed by later
+    writes to it.
+
+    `retokenize(dirty_cells=None)` re-extracts only those tokens that may have
+    been changed by edits to the given cells, defaulting to the cells changed
+    since the last call. Returns the tokens removed, and the tokens added.
+
+    The tokens re-extracted are those whose region or start index are within
+    the reach of the tokenizers of an edited cell, along with any tokens
+    uncovered or covered by those. If any tokenizer has unbounded reach, the
+    whole diagram is tokenized again.
+
+    `tokens` returns the current tokens, in the order `tokenize` yields them.
+    """
+
+    diagram: BaseDiagram[ST]
+    tokenizers: TokenizerSet[ST, VT]
+    starts: Dict[Index, List[Token[VT]]] = field(default_factory=dict)
+    owners: Dict[Index, List[Index]] = field(default_factory=dict)
+
+    @property
+    def tokens(self) -> List[Token[VT]]:
+        return [
+            token
+            for start in sorted(self.starts, key=row_major)
+            for token in self.starts[start]
+        ]
+
+    def add_token(self, start: Index, token: Token[VT]) -> None:
+        self.starts.setdefault(start, []).append(token)
+
+        for index in token.region:
+            self.owners.setdefault(index, []).append(start)
+
+    def remove_start(self, start: Index) -> List[Token[VT]]:
+        tokens = self.starts.pop(start)
+
+        for token in tokens:
+            for index in token.region:
+                owners = self.owners[index]
+                owners.remove(start)
+
+                if not owners:
+                    del self.owners[index]
+
+        return tokens
+
+    def is_covered(self, index: Index) -> bool:
+        row = row_major(index)
+
+        return any(row_major(start) < row for start in self.owners.get(index, ()))
+
+    def tokenize_all(self) -> Tuple[List[Token[VT]], List[Token[VT]]]:
+        removed = self.tokens
+        self.starts.clear()
+        self.owners.clear()
+
+        for start, token in tokenize_with_starts(self.diagram, self.tokenizers):
+            self.add_token(start, token)
+
+        return removed, self.tokens
+
+    def affected_starts(self, dirty_cells: Iterable[Index], reach: int) -> List[Index]:
+        affected = set()
+
+        for x, y in dirty_cells:
+            for near_y in range(y - reach, y + reach + 1):
+                for near_x in range(x - reach, x + reach + 1):
+                    index = near_x, near_y
+
+                    if index in self.starts:
+                        affected.add(index)
+
+                    affected.update(self.owners.get(index, ()))
+
+        return sorted(affected, key=row_major)
+
+    def retokenize(
+        self, dirty_cells: Optional[Iterable[Index]] = None
+    ) -> Tuple[List[Token[VT]], List[Token[VT]]]:
+        if dirty_cells is None:
+            dirty_cells = self.diagram.checkpoint()
+        else:
+            dirty_cells = set(dirty_cells)
+
+        reach = self.tokenizers.reach
+
+        if reach is None:
+            return self.tokenize_all()
+
+        diagram = self.diagram
+        removed = []
+        added = []
+
+        pending = [row_major(index) for index in dirty_cells]
+
+        for start in self.affected_starts(dirty_cells, reach):
+            tokens = self.remove_start(start)
+            removed.extend(tokens)
+
+            pending.append(row_major(start))
+            pending.extend(
+                row_major(index) for token in tokens for index in token.region
+            )
+
+        heapify(pending)
+        previous_row = None
+
+        with diagram.deriving():
+            # Replay the row-major scan of `tokenize`, over just the pending cells
+            while pending:
+                row = heappop(pending)
+
+                if row == previous_row:
+                    continue
+
+                previous_row = row
+                y, x = row
+                index = x, y
+                value = diagram[index]
+
+                if value == diagram.whitespace:
+                    continue
+
+                if index in self.starts or self.is_covered(index):
+                    continue
+
+                for tokenizer in self.tokenizers.candidates(value):
+                    token = tokenizer.extract_token(diagram, index)
+
+                    if token is None:
+                        raise missing_token(tokenizer, index)
+
+                    self.add_token(index, token)
+                    added.append(token)
+
+                    for covered_index in token.region:
+                        covered_row = row_major(covered_index)
+
+                        if covered_row <= row or covered_index not in self.starts:
+                            continue
+
+                        # A later token no longer starts, as it is now covered
+                        dropped = self.remove_start(covered_index)
+                        removed.extend(dropped)
+
+                        for dropped_token in dropped:
+                            for dropped_index in dropped_token.region:
+                                if row_major(dropped_index) > covered_row:
+                                    heappush(pending, row_major(dropped_index))
+
+        return removed, added
+
+    @classmethod
+    def tokenize(
+        cls,
+        diagram: BaseDiagram[ST],
+        tokenizers: Union[TokenizerSet[ST, VT], List[Tokenizer[ST, VT]]],
+    ) -> "IncrementalTokenization[ST, VT]":
+        tokenization = cls(diagram, TokenizerSet.compile(tokenizers))
+        tokenization.tokenize_all()
+        diagram.checkpoint()
+
+        return tokenization
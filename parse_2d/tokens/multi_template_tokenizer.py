@@ -0,0 +1,319 @@
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    FrozenSet,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from more_properties import cached_property
+
+from parse_2d.diagram import BaseDiagram, Index
+from parse_2d.regions import SparseRegion
+from parse_2d.tokens.budget import current_budget
+from parse_2d.tokens.symbol_classes import SymbolClass, symbol_matches
+from parse_2d.tokens.template_tokenizer import TemplateTokenizer
+from parse_2d.tokens.types import Token, Tokenizer
+
+__all__ = ["MultiTemplateTokenizer"]
+
+ST = TypeVar("ST")  # Symbol type
+VT = TypeVar("VT")  # Token value type
+
+# Template position, position of the matched cell within the template, and the
+# translation of the template
+Match = Tuple[int, int, Index]
+
+
+@dataclass(frozen=True)
+class RowAutomaton(Generic[ST]):
+    """
+    Aho-Corasick automaton, finding every occurrence of many rows of symbols in
+    one pass
+
+    RowAutomaton.build(patterns)
+    """
+
+    transitions: List[Dict[ST, int]]
+    failures: List[int]
+    outputs: List[List[int]]
+    lengths: List[int]
+
+    @classmethod
+    def build(cls, patterns: Sequence[Sequence[ST]]) -> "RowAutomaton[ST]":
+        transitions = [{}]
+        outputs = [[]]
+
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+
+            for symbol in pattern:
+                next_state = transitions[state].get(symbol)
+
+                if next_state is None:
+                    next_state = transitions[state][symbol] = len(transitions)
+                    transitions.append({})
+                    outputs.append([])
+
+                state = next_state
+
+            outputs[state].append(pattern_id)
+
+        failures = [0] * len(transitions)
+        queue = deque(transitions[0].values())
+
+        while queue:
+            state = queue.popleft()
+
+            for symbol, next_state in transitions[state].items():
+                failure = failures[state]
+
+                while failure and symbol not in transitions[failure]:
+                    failure = failures[failure]
+
+                failures[next_state] = transitions[failure].get(symbol, 0)
+                outputs[next_state] = (
+                    outputs[next_state] + outputs[failures[next_state]]
+                )
+                queue.append(next_state)
+
+        return cls(
+            transitions, failures, outputs, [len(pattern) for pattern in patterns]
+        )
+
+    def step(self, state: int, symbol: ST) -> int:
+        while True:
+            next_state = self.transitions[state].get(symbol)
+
+            if next_state is not None:
+                return next_state
+
+            if not state:
+                return 0
+
+            state = self.failures[state]
+
+    def find_all(
+        self, cells: Iterable[Tuple[Index, ST]]
+    ) -> Iterator[Tuple[Index, int]]:
+        """
+        Start index and pattern id of every occurrence of a pattern within a
+        horizontal run of the given cells, which must be in row-major order
+        """
+
+        state = 0
+        previous = None
+
+        for index, symbol in cells:
+            x, y = index
+
+            if previous != (x - 1, y):
+                state = 0
+
+            previous = index
+            state = self.step(state, symbol)
+
+            for pattern_id in self.outputs[state]:
+                yield (x - self.lengths[pattern_id] + 1, y), pattern_id
+
+
+@dataclass(frozen=True)
+class TemplateLayout(Generic[ST]):
+    """
+    A template split into horizontal runs of symbols
+
+    `cells` are the template's cells, in the order `TemplateTokenizer` tries
+    them, and `anchors` the positions in that order, and locations, of the
+    cells a token may start on.
+    `runs` are the relative start and pattern id of each run, with the anchor
+    run first.
+    `direct_cells` are the cells checked directly against the diagram, as they
+    are expected to be whitespace, or match a class of symbols.
+    """
+
+    cells: List[Index]
+    anchors: List[Tuple[int, Index]]
+    runs: List[Tuple[int, int, int]]
+    direct_cells: List[Tuple[Index, ST]]
+
+
+@dataclass(frozen=True)
+class CompiledTemplates(Generic[ST]):
+    automaton: RowAutomaton[ST]
+    layouts: List[TemplateLayout[ST]]
+
+
+@dataclass(frozen=True, eq=False)
+class MultiTemplateTokenizer(Tokenizer[ST, VT]):
+    """
+    Tokenizer for many fixed templates of symbols at once.
+
+    MultiTemplateTokenizer(tokenizers)
+
+    `tokenizers` is a sequence of TemplateTokenizers.
+
+    Extracts the same token as the first of `tokenizers` to match around the
+    starting cell, without trying each in turn.
+
+    The rows of every template are compiled into a single Aho-Corasick automaton,
+    which finds every occurrence of every row in one pass over the diagram.
+    Multi-row templates are then matched by checking the occurrences of their
+    other rows, relative to the occurrences of their first row.
+    The matches are cached on the diagram for the rest of the tokenize call.
+
+    Compares by identity, so it may key the cache.
+    """
+
+    tokenizers: Sequence[TemplateTokenizer[ST, VT]]
+
+    @cached_property
+    def symbols(self) -> Set[ST]:
+        return {symbol for tokenizer in self.tokenizers for symbol in tokenizer.symbols}
+
+    @cached_property
+    def compilations(self) -> Dict[Hashable, CompiledTemplates[ST]]:
+        return {}
+
+    def starts_on(self, symbol: ST) -> bool:
+        return symbol in self.symbols
+
+    def start_symbols(self) -> FrozenSet[ST]:
+        return frozenset(self.symbols)
+
+    def reach(self) -> int:
+        return max((tokenizer.reach() for tokenizer in self.tokenizers), default=0)
+
+    def compile(self, whitespace: ST) -> CompiledTemplates[ST]:
+        """
+        Compile the templates for diagrams with the given whitespace symbol
+        """
+
+        try:
+            return self.compilations[whitespace]
+        except KeyError:
+            pass
+
+        pattern_ids = {}
+        layouts = []
+
+        for tokenizer in self.tokenizers:
+            rows = defaultdict(list)
+            anchors = []
+            direct_cells = []
+
+            for position, ((x, y), symbol) in enumerate(tokenizer.template.items()):
+                if symbol == whitespace or isinstance(symbol, SymbolClass):
+                    direct_cells.append(((x, y), symbol))
+                else:
+                    anchors.append((position, (x, y)))
+                    rows[y].append((x, symbol))
+
+            runs = []
+
+            for y in sorted(rows):
+                row = sorted(rows[y], key=lambda cell: cell[0])
+                run_x, run = None, []
+
+                for x, symbol in row + [(None, None)]:
+                    if run and x != run_x + len(run):
+                        pattern_id = pattern_ids.setdefault(
+                            tuple(run), len(pattern_ids)
+                        )
+                        runs.append((run_x, y, pattern_id))
+                        run = []
+
+                    if not run:
+                        run_x = x
+
+                    run.append(symbol)
+
+            layouts.append(
+                TemplateLayout(list(tokenizer.template), anchors, runs, direct_cells)
+            )
+
+        compiled = self.compilations[whitespace] = CompiledTemplates(
+            RowAutomaton.build(list(pattern_ids)), layouts
+        )
+
+        return compiled
+
+    def find_matches(self, diagram: BaseDiagram[ST]) -> Dict[Index, Match]:
+        """
+        For each cell of the diagram covered by a template, the first match
+        covering it
+        """
+
+        whitespace = diagram.whitespace
+        compiled = self.compile(whitespace)
+        budget = current_budget.get()
+
+        occurrences = defaultdict(set)
+
+        for start, pattern_id in compiled.automaton.find_all(diagram.items()):
+            occurrences[pattern_id].add(start)
+
+        if budget is not None:
+            budget.spend(len(diagram) + sum(map(len, occurrences.values())))
+
+        matches = {}
+
+        for template_id, layout in enumerate(compiled.layouts):
+            if not layout.runs:
+                continue
+
+            (anchor_x, anchor_y, anchor_id), *other_runs = layout.runs
+
+            for x, y in occurrences.get(anchor_id, ()):
+                origin_x, origin_y = x - anchor_x, y - anchor_y
+
+                if not all(
+                    (origin_x + run_x, origin_y + run_y) in occurrences[pattern_id]
+                    for run_x, run_y, pattern_id in other_runs
+                ):
+                    continue
+
+                if not all(
+                    symbol_matches(
+                        symbol,
+                        diagram[origin_x + cell_x, origin_y + cell_y],
+                        whitespace,
+                    )
+                    for (cell_x, cell_y), symbol in layout.direct_cells
+                ):
+                    continue
+
+                for position, (cell_x, cell_y) in layout.anchors:
+                    cell = origin_x + cell_x, origin_y + cell_y
+                    match = matches.get(cell)
+
+                    if match is None or (
+                        match[0] == template_id and match[1] > position
+                    ):
+                        matches[cell] = template_id, position, (origin_x, origin_y)
+
+        return matches
+
+    def extract_token(self, diagram: BaseDiagram[ST], index: Index) -> Token[VT]:
+        matches = diagram.derive(self, lambda: self.find_matches(diagram))
+
+        try:
+            template_id, _, (origin_x, origin_y) = matches[index]
+        except KeyError:
+            raise IndexError(f"No template found around index {index!r}") from None
+
+        layout = self.compile(diagram.whitespace).layouts[template_id]
+
+        return Token(
+            SparseRegion(
+                frozenset((origin_x + x, origin_y + y) for x, y in layout.cells)
+            ),
+            self.tokenizers[template_id].token_value,
+        )
@@ -0,0 +1,290 @@
+from bisect import bisect, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar, Union
+
+from more_properties import cached_property
+
+from parse_2d.diagram import BaseDiagram, Index
+from parse_2d.regions import RectRegion
+from parse_2d.tokens.box_tokenizer import BoxTokenizer
+from parse_2d.tokens.translation import Directions
+from parse_2d.tokens.types import Token
+
+__all__ = ["NestedBoxTokenizer"]
+
+ST = TypeVar("ST")  # Symbol type
+VT = TypeVar("VT")  # Token value type
+
+# The top left and bottom right corners of a box
+Rect = Tuple[Index, Index]
+
+
+def contains(outer: Rect, inner: Rect) -> bool:
+    (outer_min_x, outer_min_y), (outer_max_x, outer_max_y) = outer
+    (inner_min_x, inner_min_y), (inner_max_x, inner_max_y) = inner
+
+    return (
+        outer_min_x <= inner_min_x
+        and outer_min_y <= inner_min_y
+        and inner_max_x <= outer_max_x
+        and inner_max_y <= outer_max_y
+    )
+
+
+@dataclass
+class BoxTree(Generic[ST]):
+    """
+    The boxes of a diagram, and the boxes directly containing them
+
+    `rects` are the boxes, in row-major order of their top left corners, with
+    containing boxes first.
+
+    `parents` maps each box, by its position in `rects`, to the position of the
+    box directly containing it, or None for outermost boxes.
+
+    `cells` maps each box to the relative positions and symbols of the cells
+    directly inside it, rather than inside a box within it.
+    """
+
+    rects: List[Rect]
+    parents: List[Optional[int]]
+    cells: List[List[Tuple[Index, ST]]]
+
+
+@dataclass
+class NestedBoxTokens(Generic[VT]):
+    """
+    The tokens of the outermost boxes of a diagram
+
+    `tokens` maps each cell within an outermost box to the box's token.
+
+    `contents_tokenized` counts the calls made to `contents_tokenizer`.
+    """
+
+    tokens: Dict[Index, Token[VT]]
+    contents_tokenized: int
+
+
+@dataclass(frozen=True)
+class NestedBoxTokenizer(BoxTokenizer[ST, VT]):
+    """
+    Tokenizer for tokens represented by a box of edge symbols, which may
+    contain further boxes.
+
+    NestedBoxTokenizer(edge_symbols, contents_tokenizer)
+
+    `edge_symbols` is as for `BoxTokenizer`.
+
+    `contents_tokenizer` is a function to determine the value of a box, and is
+    passed a view of the entire box (including the edge), and the tokens of the
+    boxes directly inside it, with regions relative to the view.
+
+    Every box in the diagram is found in a single pass, tracing from each top
+    left corner symbol, and the contents of the boxes are tokenized from the
+    innermost boxes outwards.
+    Boxes with the same symbols, including those of the boxes inside them, are
+    only tokenized once, so `contents_tokenizer` must depend only on the
+    symbols of the box.
+    The tokens are cached on the diagram for the rest of the tokenize call.
+
+    Boxes partially overlapping a box earlier in row-major order are ignored.
+    """
+
+    contents_tokenizer: Callable[[BaseDiagram[ST], List[Token[VT]]], VT]
+
+    @cached_property
+    def tree_cache_key(self) -> object:
+        return object()
+
+    def reach(self) -> Optional[int]:
+        # Whether a box is nested depends on the boxes around it
+        return None
+
+    def box_tree(self, diagram: BaseDiagram[ST]) -> BoxTree[ST]:
+        """
+        Find the boxes of the diagram, and the cells directly inside each
+
+        Boxes are traced from each top left corner symbol, then the rows of the
+        diagram are swept, keeping the boxes spanning the current row ordered by
+        their left edges. As the boxes are nested, the box directly containing a
+        cell is the innermost of these still open at the cell's column.
+        """
+
+        corner_symbols = self.edge_symbols.get(Directions.UP_LEFT, frozenset())
+        traced = set()
+        rows = defaultdict(list)
+
+        for index, symbol in diagram.items():
+            x, y = index
+            rows[y].append((x, symbol))
+
+            if symbol in corner_symbols:
+                try:
+                    traced.add(self.trace_rect(diagram, index, Directions.UP_LEFT))
+                except TypeError:
+                    pass
+
+        starting = defaultdict(list)
+
+        for rect in sorted(
+            traced, key=lambda rect: (rect[0][1], rect[0][0], -rect[1][1], -rect[1][0])
+        ):
+            starting[rect[0][1]].append(rect)
+
+        rects = []
+        parents = []
+        cells = []
+
+        # Left edge, negated right edge, and position of each box spanning the
+        # current row, so containing boxes come first
+        spanning = []
+
+        for y in sorted(rows.keys() | starting.keys()):
+            spanning = [box for box in spanning if rects[box[2]][1][1] > y]
+
+            for rect in starting[y]:
+                parent = self.parent_box(rects, parents, spanning, rect)
+
+                if parent is False:
+                    continue
+
+                (min_x, _), (max_x, _) = rect
+                insort(spanning, (min_x, -max_x, len(rects)))
+                rects.append(rect)
+                parents.append(parent)
+                cells.append([])
+
+            open_boxes = []
+            boxes = iter(spanning)
+            box = next(boxes, None)
+
+            for x, symbol in rows[y]:
+                while open_boxes and rects[open_boxes[-1]][1][0] <= x:
+                    open_boxes.pop()
+
+                while box is not None and box[0] <= x:
+                    if -box[1] > x:
+                        open_boxes.append(box[2])
+
+                    box = next(boxes, None)
+
+                if open_boxes:
+                    (min_x, min_y), _ = rects[open_boxes[-1]]
+                    cells[open_boxes[-1]].append(((x - min_x, y - min_y), symbol))
+
+        return BoxTree(rects, parents, cells)
+
+    @staticmethod
+    def parent_box(
+        rects: List[Rect],
+        parents: List[Optional[int]],
+        spanning: List[Tuple[int, int, int]],
+        rect: Rect,
+    ) -> Union[int, None, bool]:
+        """
+        The innermost box spanning the top row of the given box, that contains
+        it, None if there is no such box, or False if it partially overlaps one
+        """
+
+        (min_x, _), (max_x, _) = rect
+        position = bisect(spanning, (min_x, -max_x, len(rects)))
+
+        if position < len(spanning) and spanning[position][0] < max_x:
+            # A box starting on an earlier row, within this box's columns
+            return False
+
+        if not position:
+            return None
+
+        # The innermost box containing this box's left edge is the last box
+        # starting before it, or the innermost box containing that
+        parent = spanning[position - 1][2]
+
+        while parent is not None and rects[parent][1][0] <= min_x:
+            parent = parents[parent]
+
+        if parent is not None and not contains(rects[parent], rect):
+            return False
+
+        return parent
+
+    def tokenize_boxes(self, diagram: BaseDiagram[ST]) -> NestedBoxTokens[VT]:
+        """
+        Tokenize the contents of every box of the diagram, from the innermost
+        outwards, tokenizing boxes with the same contents only once
+        """
+
+        tree = self.box_tree(diagram)
+
+        children = [[] for _ in tree.rects]
+
+        for box, parent in enumerate(tree.parents):
+            if parent is not None:
+                children[parent].append(box)
+
+        content_ids = {}
+        values = []
+        box_content_ids = [None] * len(tree.rects)
+
+        for box in reversed(range(len(tree.rects))):
+            (min_x, min_y), (max_x, max_y) = tree.rects[box]
+            child_contents = []
+
+            for child in children[box]:
+                (left, top), (right, bottom) = tree.rects[child]
+                child_contents.append(
+                    (
+                        (left - min_x, top - min_y),
+                        (right - min_x, bottom - min_y),
+                        box_content_ids[child],
+                    )
+                )
+
+            # Child boxes are identified by their contents' ids, so building the
+            # key is linear in the cells directly inside the box
+            key = (
+                (max_x - min_x, max_y - min_y),
+                tuple(tree.cells[box]),
+                tuple(child_contents),
+            )
+
+            content_id = content_ids.get(key)
+
+            if content_id is None:
+                content_id = content_ids[key] = len(values)
+                values.append(
+                    self.contents_tokenizer(
+                        diagram[(min_x, min_y):(max_x, max_y)],
+                        [
+                            Token(RectRegion(top_left, bottom_right), values[child_id])
+                            for top_left, bottom_right, child_id in child_contents
+                        ],
+                    )
+                )
+
+            box_content_ids[box] = content_id
+
+        tokens = {}
+        outermost_tokens = []
+
+        for box, (rect, parent) in enumerate(zip(tree.rects, tree.parents)):
+            if parent is None:
+                token = Token(RectRegion(*rect), values[box_content_ids[box]])
+            else:
+                # Containing boxes come first
+                token = outermost_tokens[parent]
+
+            outermost_tokens.append(token)
+            (min_x, min_y), _ = rect
+
+            for (x, y), _ in tree.cells[box]:
+                tokens[min_x + x, min_y + y] = token
+
+        return NestedBoxTokens(tokens, len(values))
+
+    def nested_tokens(self, diagram: BaseDiagram[ST]) -> NestedBoxTokens[VT]:
+        return diagram.derive(self.tree_cache_key, lambda: self.tokenize_boxes(diagram))
+
+    def extract_token(self, diagram: BaseDiagram[ST], index: Index) -> Token[VT]:
+        return self.nested_tokens(diagram).tokens.get(index)
@@ -0,0 +1,277 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from heapq import heappop, heappush
+from itertools import islice
+from math import ceil
+from os import cpu_count
+from sys import version_info
+from typing import (
+    Any,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from parse_2d.diagram import BaseDiagram, Index
+from parse_2d.tokens.coverage import Coverage
+from parse_2d.tokens.types import (
+    Token,
+    Tokenizer,
+    TokenizerSet,
+    missing_token,
+    scan,
+    tokenize,
+    tokenize_with_starts,
+)
+
+__all__ = ["tokenize_parallel", "tokenize_many"]
+
+ST = TypeVar("ST")  # Symbol type
+VT = TypeVar("VT")  # Token value type
+K = TypeVar("K", bound=Hashable)  # Diagram id type
+
+Band = Tuple[int, int]
+
+# Set in each worker process by `init_worker`
+worker_shared: Tuple[Any, ...] = ()
+
+
+def init_worker(*shared: Any) -> None:
+    global worker_shared
+
+    worker_shared = shared
+
+
+@contextmanager
+def worker_pool(workers: int, *shared: Any) -> Iterator[ProcessPoolExecutor]:
+    """
+    A pool of worker processes, each given the shared objects once, as it starts
+
+    Before Python 3.7, pools have no initializer, so the objects are set in this
+    process while the pool is open, for the workers to inherit when they fork.
+    """
+
+    if version_info >= (3, 7):
+        with ProcessPoolExecutor(
+            workers, initializer=init_worker, initargs=shared
+        ) as executor:
+            yield executor
+
+        return
+
+    init_worker(*shared)
+
+    try:
+        with ProcessPoolExecutor(workers) as executor:
+            yield executor
+    finally:
+        init_worker()
+
+
+def tokenize_chunk(
+    chunk: List[Tuple[K, BaseDiagram[ST]]],
+) -> List[Tuple[K, List[Token[VT]]]]:
+    (tokenizer_set,) = worker_shared
+
+    return [
+        (diagram_id, list(tokenize(diagram, tokenizer_set)))
+        for diagram_id, diagram in chunk
+    ]
+
+
+def band_cells(diagram: BaseDiagram[ST], band: Band) -> Iterable[Tuple[Index, ST]]:
+    (min_x, _), (max_x, _) = diagram.bounds
+    min_y, max_y = band
+
+    return diagram.items_within((min_x, min_y), (max_x, max_y))
+
+
+def tokenize_band(band: Band) -> List[Tuple[Index, Token]]:
+    diagram, tokenizer_set = worker_shared
+
+    return [
+        (index, token)
+        for index, _, token in scan(diagram, tokenizer_set, band_cells(diagram, band))
+    ]
+
+
+def stitch_band(
+    diagram: BaseDiagram[ST],
+    tokenizer_set: TokenizerSet[ST, VT],
+    band: Band,
+    band_tokens: List[Tuple[Index, Token[VT]]],
+    diagram_coverage: Coverage,
+) -> Iterable[Tuple[Index, Token[VT]]]:
+    """
+    Replay the band's tokens over the coverage of the tokens before it,
+    dropping tokens whose start is already covered, and extracting tokens from
+    any cells that dropped tokens had covered
+    """
+
+    min_y, max_y = band
+    pending = []
+    starts = {}
+
+    for start, token in band_tokens:
+        x, y = start
+
+        if (y, x) not in starts:
+            heappush(pending, (y, x))
+
+        starts.setdefault((y, x), []).append(token)
+
+    previous_row = None
+
+    while pending:
+        row = heappop(pending)
+
+        if row == previous_row:
+            continue
+
+        previous_row = row
+        y, x = row
+        index = x, y
+
+        if index in diagram_coverage:
+            if row in starts:
+                for token in starts.pop(row):
+                    for covered_x, covered_y in token.region:
+                        if (covered_y, covered_x) > row and covered_y < max_y:
+                            heappush(pending, (covered_y, covered_x))
+
+            continue
+
+        if row in starts:
+            tokens = starts.pop(row)
+        else:
+            value = diagram[index]
+
+            if value == diagram.whitespace:
+                continue
+
+            tokens = []
+
+            for tokenizer in tokenizer_set.candidates(value):
+                token = tokenizer.extract_token(diagram, index)
+
+                if token is None:
+                    raise missing_token(tokenizer, index)
+
+                tokens.append(token)
+
+        for token in tokens:
+            diagram_coverage.add(token.region)
+            yield index, token
+
+
+def tokenize_parallel(
+    diagram: BaseDiagram[ST],
+    tokenizers: Union[TokenizerSet[ST, VT], List[Tokenizer[ST, VT]]],
+    workers: Optional[int] = None,
+    band_height: Optional[int] = None,
+) -> Iterable[Token[VT]]:
+    """
+    Tokenize the diagram in horizontal bands, across a pool of worker processes
+
+    Yields the same tokens, in the same order, as `tokenize`.
+
+    Each band is tokenized independently, then stitched to the bands above it,
+    in order, repairing any tokens that cross band boundaries.
+
+    The diagram and tokenizers are shared with each worker process once, as it
+    starts, so must be picklable on platforms that do not fork, as must the
+    token values.
+    """
+
+    tokenizer_set = TokenizerSet.compile(tokenizers)
+
+    if workers is None:
+        workers = cpu_count() or 1
+
+    if workers <= 1:
+        for _, token in tokenize_with_starts(diagram, tokenizer_set):
+            yield token
+
+        return
+
+    (_, min_y), (_, max_y) = diagram.bounds
+
+    if band_height is None:
+        band_height = max(ceil((max_y - min_y) / (workers * 4)), 1)
+
+    bands = [
+        (band_min_y, min(band_min_y + band_height, max_y))
+        for band_min_y in range(min_y, max_y, band_height)
+    ]
+    diagram_coverage = Coverage()
+
+    with worker_pool(workers, diagram, tokenizer_set) as executor:
+        with diagram.deriving():
+            for band, band_tokens in zip(bands, executor.map(tokenize_band, bands)):
+                for _, token in stitch_band(
+                    diagram, tokenizer_set, band, band_tokens, diagram_coverage
+                ):
+                    yield token
+
+
+def tokenize_many(
+    diagrams: Iterable[Tuple[K, BaseDiagram[ST]]],
+    tokenizers: Union[TokenizerSet[ST, VT], List[Tokenizer[ST, VT]]],
+    workers: Optional[int] = None,
+    chunk_size: int = 16,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[Tuple[K, List[Token[VT]]]]:
+    """
+    Tokenize many diagrams across a pool of worker processes
+
+    `diagrams` is an iterable of pairs of a diagram id, and a diagram.
+
+    Yields pairs of each diagram id, and the list of tokens of that diagram, as
+    they complete, which may not be the order given.
+
+    The tokenizers are compiled once, and shared with each worker process once,
+    as it starts. Diagrams are sent to workers in chunks of `chunk_size`, with at
+    most `max_in_flight` chunks, defaulting to twice the number of workers,
+    submitted at once, so `diagrams` may be a lazy iterable of any length.
+    """
+
+    tokenizer_set = TokenizerSet.compile(tokenizers)
+
+    if workers is None:
+        workers = cpu_count() or 1
+
+    if max_in_flight is None:
+        max_in_flight = 2 * workers
+
+    diagrams = iter(diagrams)
+
+    if workers <= 1:
+        for diagram_id, diagram in diagrams:
+            yield diagram_id, list(tokenize(diagram, tokenizer_set))
+
+        return
+
+    with worker_pool(workers, tokenizer_set) as executor:
+        in_flight = set()
+
+        while True:
+            while len(in_flight) < max_in_flight:
+                chunk = list(islice(diagrams, chunk_size))
+
+                if not chunk:
+                    break
+
+                in_flight.add(executor.submit(tokenize_chunk, chunk))
+
+            if not in_flight:
+                return
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                yield from future.result()
@@ -0,0 +1,80 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Tuple
+
+from parse_2d.tokens.thread_value import ThreadValue
+
+__all__ = ["TokenizerStats", "TokenizeStats", "record"]
+
+
+@dataclass
+class TokenizerStats:
+    """
+    Counters for the work done by a single tokenizer
+
+    `starts_on_calls` counts calls to `starts_on` while scanning. Tokenizers
+    that declare their start symbols are dispatched to by table lookup instead.
+
+    `extract_calls` and `extract_failures` count calls to `extract_token`, and
+    those that raised or returned no token.
+
+    `time` is the total wall time, in seconds, spent in `extract_token`.
+
+    `cells_covered` is the total size of the regions of the extracted tokens.
+
+    `events` counts tokenizer specific events, such as the number of cells a
+    `WireTokenizer` expands to, or the number of retries of
+    `BoxTokenizer.trace_box`.
+    """
+
+    starts_on_calls: int = 0
+    extract_calls: int = 0
+    extract_failures: int = 0
+    time: float = 0.0
+    cells_covered: int = 0
+    events: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class TokenizeStats:
+    """
+    Per tokenizer stats, collected by passing to `tokenize`
+
+    TokenizeStats()
+
+    `stats[tokenizer]` returns the stats of the given tokenizer, which is looked
+    up by identity, as tokenizers need not be hashable.
+
+    `items()` returns pairs of each tokenizer and its stats.
+
+    The same object may be passed to many calls of `tokenize`, to accumulate
+    stats across them.
+    """
+
+    tokenizer_stats: Dict[int, Tuple[Any, TokenizerStats]] = field(default_factory=dict)
+
+    def __getitem__(self, tokenizer) -> TokenizerStats:
+        entry = self.tokenizer_stats.get(id(tokenizer))
+
+        if entry is None:
+            entry = self.tokenizer_stats[id(tokenizer)] = tokenizer, TokenizerStats()
+
+        return entry[1]
+
+    def items(self) -> Iterable[Tuple[Any, TokenizerStats]]:
+        return self.tokenizer_stats.values()
+
+
+# The stats being collected by the `tokenize` call currently extracting a token
+current_stats = ThreadValue()
+
+
+def record(tokenizer, event: str, count: int = 1) -> None:
+    """
+    Record a tokenizer specific event, if stats are being collected
+    """
+
+    stats = current_stats.get()
+
+    if stats is not None:
+        stats[tokenizer].events[event] += count
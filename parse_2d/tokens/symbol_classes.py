@@ -0,0 +1,57 @@
+from abc import ABCMeta, abstractmethod
+from dataclasses import dataclass
+from typing import FrozenSet, Generic, TypeVar
+
+__all__ = ["SymbolClass", "AnySymbol", "OneOf", "symbol_matches"]
+
+ST = TypeVar("ST")  # Symbol type
+
+
+class SymbolClass(Generic[ST], metaclass=ABCMeta):
+    """
+    Abstract class for template cells that match a class of symbols, rather
+    than a single symbol.
+
+    `matches(symbol, whitespace)` returns whether the given symbol, from a
+    diagram with the given whitespace symbol, is in the class.
+    """
+
+    @abstractmethod
+    def matches(self, symbol: ST, whitespace: ST) -> bool:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class AnySymbol(SymbolClass[ST]):
+    """
+    Template cell matching any non-whitespace symbol
+
+    AnySymbol()
+    """
+
+    def matches(self, symbol: ST, whitespace: ST) -> bool:
+        return symbol != whitespace
+
+
+@dataclass(frozen=True)
+class OneOf(SymbolClass[ST]):
+    """
+    Template cell matching any one of the given symbols
+
+    OneOf(symbols)
+    """
+
+    symbols: FrozenSet[ST]
+
+    def __post_init__(self):
+        object.__setattr__(self, "symbols", frozenset(self.symbols))
+
+    def matches(self, symbol: ST, whitespace: ST) -> bool:
+        return symbol in self.symbols
+
+
+def symbol_matches(expected: ST, symbol: ST, whitespace: ST) -> bool:
+    if isinstance(expected, SymbolClass):
+        return expected.matches(symbol, whitespace)
+
+    return symbol == expected
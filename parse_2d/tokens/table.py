@@ -0,0 +1,201 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar, Union
+
+from parse_2d.diagram import Diagram, Index
+from parse_2d.regions import RectRegion, Region, SparseRegion, TinyRegion
+from parse_2d.tokens.budget import WorkBudget
+from parse_2d.tokens.stats import TokenizeStats
+from parse_2d.tokens.types import Token, Tokenizer, TokenizerSet, extract_tokens
+
+__all__ = ["TokenTable", "tokenize_table"]
+
+ST = TypeVar("ST")  # Symbol type
+VT = TypeVar("VT")  # Token value type
+
+# Region kinds
+TINY = 0
+RECT = 1
+SPARSE = 2
+CELLS = 3
+
+
+@dataclass
+class TokenTable(Generic[VT]):
+    """
+    Columnar table of tokens, storing each column in a flat array
+
+    TokenTable()
+
+    For each token, stores the position of its tokenizer, its start index, the
+    id of its value, the kind of its region, and its bounding box, with the
+    bottom right corner excluded.
+    The cells of regions that are not rectangles are stored in the shared
+    `cell_xs` and `cell_ys` arrays, from `cell_offsets[i]` to
+    `cell_offsets[i + 1]`.
+
+    Values are stored once each in `values`, with equal hashable values
+    sharing an id.
+
+    `table[i]` materializes the `i`th token. Regions that are neither a
+    TinyRegion nor a RectRegion materialize as a SparseRegion if they were one,
+    and as a set of cells otherwise.
+
+    `append(start, tokenizer_id, token)` adds a token to the table.
+
+    Tables are made of arrays of numbers, and a list of values, so are cheap to
+    pickle.
+    """
+
+    tokenizer_ids: array = field(default_factory=lambda: array("l"))
+    start_xs: array = field(default_factory=lambda: array("q"))
+    start_ys: array = field(default_factory=lambda: array("q"))
+    value_ids: array = field(default_factory=lambda: array("l"))
+    region_kinds: array = field(default_factory=lambda: array("b"))
+    min_xs: array = field(default_factory=lambda: array("q"))
+    min_ys: array = field(default_factory=lambda: array("q"))
+    max_xs: array = field(default_factory=lambda: array("q"))
+    max_ys: array = field(default_factory=lambda: array("q"))
+    cell_offsets: array = field(default_factory=lambda: array("Q", [0]))
+    cell_xs: array = field(default_factory=lambda: array("q"))
+    cell_ys: array = field(default_factory=lambda: array("q"))
+    values: List[VT] = field(default_factory=list)
+    value_lookup: Dict[Any, int] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    def __len__(self) -> int:
+        return len(self.tokenizer_ids)
+
+    def __getitem__(self, item: int) -> Token[VT]:
+        return Token(self.region(item), self.values[self.value_ids[item]])
+
+    def __iter__(self) -> Iterator[Token[VT]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["value_lookup"]
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.value_lookup = {}
+
+    def start(self, item: int) -> Index:
+        return self.start_xs[item], self.start_ys[item]
+
+    def bounding_box(self, item: int) -> Tuple[Index, Index]:
+        return (
+            (self.min_xs[item], self.min_ys[item]),
+            (self.max_xs[item], self.max_ys[item]),
+        )
+
+    def cells(self, item: int) -> Iterator[Index]:
+        kind = self.region_kinds[item]
+
+        if kind == TINY or kind == RECT:
+            yield from RectRegion(*self.bounding_box(item))
+            return
+
+        start = self.cell_offsets[item]
+        stop = self.cell_offsets[item + 1]
+
+        yield from zip(self.cell_xs[start:stop], self.cell_ys[start:stop])
+
+    def region(self, item: int) -> Region:
+        kind = self.region_kinds[item]
+
+        if kind == TINY:
+            return TinyRegion((self.min_xs[item], self.min_ys[item]))
+
+        if kind == RECT:
+            return RectRegion(*self.bounding_box(item))
+
+        if kind == SPARSE:
+            return SparseRegion(frozenset(self.cells(item)))
+
+        return set(self.cells(item))
+
+    def value_id(self, value: VT) -> int:
+        try:
+            return self.value_lookup[value]
+        except KeyError:
+            value_id = self.value_lookup[value] = len(self.values)
+        except TypeError:
+            # Unhashable values are not shared
+            value_id = len(self.values)
+
+        self.values.append(value)
+
+        return value_id
+
+    def append(self, start: Index, tokenizer_id: int, token: Token[VT]) -> None:
+        region = token.region
+        start_x, start_y = start
+
+        self.tokenizer_ids.append(tokenizer_id)
+        self.start_xs.append(start_x)
+        self.start_ys.append(start_y)
+        self.value_ids.append(self.value_id(token.value))
+
+        if isinstance(region, TinyRegion):
+            kind = TINY
+            min_x, min_y = region.location
+            max_x, max_y = min_x + 1, min_y + 1
+        elif isinstance(region, RectRegion):
+            kind = RECT
+            (min_x, min_y), (max_x, max_y) = region.top_left, region.bottom_right
+        else:
+            kind = SPARSE if isinstance(region, SparseRegion) else CELLS
+            cell_count = 0
+
+            for x, y in region:
+                self.cell_xs.append(x)
+                self.cell_ys.append(y)
+                cell_count += 1
+
+            if cell_count:
+                cells_start = self.cell_offsets[-1]
+                xs = self.cell_xs[cells_start:]
+                ys = self.cell_ys[cells_start:]
+                min_x, min_y = min(xs), min(ys)
+                max_x, max_y = max(xs) + 1, max(ys) + 1
+            else:
+                min_x, min_y = max_x, max_y = start
+
+        self.cell_offsets.append(len(self.cell_xs))
+        self.region_kinds.append(kind)
+        self.min_xs.append(min_x)
+        self.min_ys.append(min_y)
+        self.max_xs.append(max_x)
+        self.max_ys.append(max_y)
+
+
+def tokenize_table(
+    diagram: Diagram[ST],
+    tokenizers: Union[TokenizerSet[ST, VT], List[Tokenizer[ST, VT]]],
+    stats: Optional[TokenizeStats] = None,
+    budget: Optional[WorkBudget] = None,
+) -> TokenTable[VT]:
+    """
+    Tokenize the diagram into a `TokenTable`, with tokenizer ids giving the
+    position of each token's tokenizer in `tokenizers`
+    """
+
+    tokenizer_set = TokenizerSet.compile(tokenizers)
+    tokenizer_ids = {}
+
+    for tokenizer_id, tokenizer in enumerate(tokenizer_set.tokenizers):
+        tokenizer_ids.setdefault(id(tokenizer), tokenizer_id)
+
+    table = TokenTable()
+
+    for start, tokenizer, token in extract_tokens(
+        diagram, tokenizer_set, stats, budget
+    ):
+        table.append(start, tokenizer_ids[id(tokenizer)], token)
+
+    return table
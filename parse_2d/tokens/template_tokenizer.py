@@ -1,10 +1,14 @@
+from collections import Counter
 from dataclasses import dataclass
-from typing import Mapping, TypeVar
+from typing import Dict, FrozenSet, Generic, List, Mapping, Set, Tuple, TypeVar
 
 from more_properties import cached_property
 
 from parse_2d.diagram import Diagram, Index
 from parse_2d.regions import SparseRegion
+from parse_2d.tokens.budget import current_budget
+from parse_2d.tokens.stats import record
+from parse_2d.tokens.symbol_classes import SymbolClass, symbol_matches
 from parse_2d.tokens.translation import Translation
 from parse_2d.tokens.types import Token, Tokenizer
 
@@ -13,6 +17,30 @@ __all__ = ["TemplateTokenizer"]
 ST = TypeVar("ST")  # Symbol type
 VT = TypeVar("VT")  # Token value type
 
+Offset = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class Anchor(Generic[ST]):
+    """
+    A template cell that a token may start on
+
+    `location` is the anchor's location in the template.
+
+    `checks` are the offsets from the anchor of the other fixed cells of the
+    template, with the symbols expected there, rarest first.
+
+    `class_checks` are the offsets from the anchor of the template's symbol
+    class cells, with the class of symbols expected there.
+
+    `cells` are the offsets from the anchor of every cell of the template.
+    """
+
+    location: Index
+    checks: List[Tuple[int, int, ST]]
+    class_checks: List[Tuple[int, int, SymbolClass[ST]]]
+    cells: List[Offset]
+
 
 @dataclass(frozen=True)
 class TemplateTokenizer(Tokenizer[ST, VT]):
@@ -22,10 +50,20 @@ class TemplateTokenizer(Tokenizer[ST, VT]):
     TemplateTokenizer(template, token_value)
 
     `template` is either a mapping of relative locations to symbols, or a
-    Diagram.
+    Diagram. Cells of the template may also be a SymbolClass, such as
+    `AnySymbol()` or `OneOf(symbols)`, to match any of a class of symbols.
+    Tokens only start on the fixed symbols of the template, so it should have
+    at least one.
 
     Extracts a token of value `token_value` for every non-overlapping
     translation of the template found in the parent Diagram.
+
+    The template is compiled once into the anchors for each symbol, with the
+    cells of each checked in order of how rarely their symbol occurs in the
+    template, so that failed matches are rejected early.
+
+    `find_all(diagram)` returns the tokens `tokenize(diagram, [tokenizer])`
+    yields, matching the template against every translation at once.
     """
 
     template: Mapping[Index, ST]
@@ -33,32 +71,203 @@ class TemplateTokenizer(Tokenizer[ST, VT]):
 
     @cached_property
     def symbols(self):
-        return set(self.template.values())
+        return {
+            symbol
+            for symbol in self.template.values()
+            if not isinstance(symbol, SymbolClass)
+        }
+
+    @cached_property
+    def anchors(self) -> Dict[ST, List[Anchor[ST]]]:
+        symbol_counts = Counter(self.template.values())
+        cells = sorted(
+            (
+                (index, symbol)
+                for index, symbol in self.template.items()
+                if symbol in self.symbols
+            ),
+            key=lambda cell: symbol_counts[cell[1]],
+        )
+        class_cells = [
+            (index, symbol)
+            for index, symbol in self.template.items()
+            if isinstance(symbol, SymbolClass)
+        ]
+        anchors = {}
+
+        for (anchor_x, anchor_y), anchor_symbol in self.template.items():
+            if anchor_symbol not in self.symbols:
+                continue
+
+            anchors.setdefault(anchor_symbol, []).append(
+                Anchor(
+                    (anchor_x, anchor_y),
+                    [
+                        (x - anchor_x, y - anchor_y, symbol)
+                        for (x, y), symbol in cells
+                        if (x, y) != (anchor_x, anchor_y)
+                    ],
+                    [
+                        (x - anchor_x, y - anchor_y, symbol_class)
+                        for (x, y), symbol_class in class_cells
+                    ],
+                    [(x - anchor_x, y - anchor_y) for x, y in self.template],
+                )
+            )
+
+        return anchors
 
     def starts_on(self, symbol: ST) -> bool:
         return symbol in self.symbols
 
+    def start_symbols(self) -> FrozenSet[ST]:
+        return frozenset(self.symbols)
+
+    def reach(self) -> int:
+        xs = [x for x, y in self.template]
+        ys = [y for x, y in self.template]
+
+        return max(max(xs) - min(xs), max(ys) - min(ys))
+
     def matches(self, diagram: Diagram[ST], translation: Translation):
+        budget = current_budget.get()
+
+        if budget is not None:
+            budget.spend(len(self.template))
+
         return all(
-            diagram[i + translation] == symbol for i, symbol in self.template.items()
+            symbol_matches(symbol, diagram[i + translation], diagram.whitespace)
+            for i, symbol in self.template.items()
         )
 
-    def extract_token(self, diagram: Diagram[ST], index: Index) -> Token[VT]:
-        starting_symbol = diagram[index]
+    def symbol_positions(self, diagram: Diagram[ST]) -> Dict[ST, Set[Index]]:
+        """
+        The positions of each non-whitespace symbol of the template in the
+        diagram, using the diagram's symbol index if it has one
+        """
 
-        potential_translations = (
-            Translation.between(i, index)
-            for i, symbol in self.template.items()
-            if symbol == starting_symbol
+        symbols = self.symbols - {diagram.whitespace}
+
+        if diagram.symbol_index is not None:
+            return {symbol: set(diagram.positions_of(symbol)) for symbol in symbols}
+
+        positions = {symbol: set() for symbol in symbols}
+
+        for index, symbol in diagram.items():
+            if symbol in positions:
+                positions[symbol].add(index)
+
+        return positions
+
+    def match_translations(
+        self, diagram: Diagram[ST], positions: Dict[ST, Set[Index]]
+    ) -> Set[Index]:
+        """
+        The translations, as the index the template's origin is moved to, of
+        every match of the template in the diagram
+
+        Starts from the positions of the rarest symbol in the diagram, and
+        filters them by each other cell in turn, so each cell is checked with
+        a set lookup against every remaining translation at once. Whitespace
+        cells, and cells matching a class of symbols, are checked last, against
+        the diagram.
+        """
+
+        whitespace = diagram.whitespace
+        budget = current_budget.get()
+
+        cells = sorted(
+            (
+                (index, symbol)
+                for index, symbol in self.template.items()
+                if symbol in positions
+            ),
+            key=lambda cell: len(positions[cell[1]]),
         )
+        direct_cells = [
+            (index, symbol)
+            for index, symbol in self.template.items()
+            if symbol not in positions
+        ]
 
-        for translation in potential_translations:
-            if self.matches(diagram, translation):
-                return Token(
-                    SparseRegion(
-                        frozenset(index + translation for index in self.template)
-                    ),
-                    self.token_value,
-                )
+        if not cells:
+            return set()
+
+        ((first_x, first_y), first_symbol), *other_cells = cells
+        translations = {(x - first_x, y - first_y) for x, y in positions[first_symbol]}
+
+        for (cell_x, cell_y), symbol in other_cells:
+            if budget is not None:
+                budget.spend(len(translations))
+
+            symbol_positions = positions[symbol]
+            translations = {
+                (x, y)
+                for x, y in translations
+                if (x + cell_x, y + cell_y) in symbol_positions
+            }
+
+        for (cell_x, cell_y), symbol in direct_cells:
+            translations = {
+                (x, y)
+                for x, y in translations
+                if symbol_matches(symbol, diagram[x + cell_x, y + cell_y], whitespace)
+            }
+
+        return translations
+
+    def find_all(self, diagram: Diagram[ST]) -> List[Token[VT]]:
+        positions = self.symbol_positions(diagram)
+        translations = self.match_translations(diagram, positions)
+
+        starts = sorted(
+            (y, x)
+            for symbol_positions in positions.values()
+            for x, y in symbol_positions
+        )
+        covered = set()
+        tokens = []
+
+        for y, x in starts:
+            if (x, y) in covered:
+                continue
+
+            for anchor in self.anchors[diagram[x, y]]:
+                anchor_x, anchor_y = anchor.location
+
+                if (x - anchor_x, y - anchor_y) in translations:
+                    region = frozenset((x + dx, y + dy) for dx, dy in anchor.cells)
+                    covered.update(region)
+                    tokens.append(Token(SparseRegion(region), self.token_value))
+                    break
+            else:
+                raise IndexError(f"Template not found around index {(x, y)!r}")
+
+        return tokens
+
+    def extract_token(self, diagram: Diagram[ST], index: Index) -> Token[VT]:
+        budget = current_budget.get()
+        x, y = index
+
+        for anchor in self.anchors.get(diagram[index], ()):
+            if budget is not None:
+                budget.spend(len(self.template))
+
+            for dx, dy, symbol in anchor.checks:
+                if diagram[x + dx, y + dy] != symbol:
+                    break
+            else:
+                if all(
+                    symbol_class.matches(diagram[x + dx, y + dy], diagram.whitespace)
+                    for dx, dy, symbol_class in anchor.class_checks
+                ):
+                    return Token(
+                        SparseRegion(
+                            frozenset((x + dx, y + dy) for dx, dy in anchor.cells)
+                        ),
+                        self.token_value,
+                    )
+
+            record(self, "failed_matches")
 
         raise IndexError(f"Template not found around index {index!r}")
@@ -0,0 +1,31 @@
+from threading import local
+from typing import Any
+
+__all__ = ["ThreadValue"]
+
+
+class ThreadValue(local):
+    """
+    A value local to each thread, defaulting to None
+
+    ThreadValue()
+
+    `get()` returns the current thread's value. `set(value)` sets it, and
+    returns a token that `reset(token)` uses to restore the previous value.
+
+    Stands in for `contextvars.ContextVar`, which needs Python 3.7.
+    """
+
+    value: Any = None
+
+    def get(self) -> Any:
+        return self.value
+
+    def set(self, value: Any) -> Any:
+        previous = self.value
+        self.value = value
+
+        return previous
+
+    def reset(self, token: Any) -> None:
+        self.value = token
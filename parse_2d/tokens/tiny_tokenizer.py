@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import TypeVar
+from typing import FrozenSet, TypeVar
 
 from parse_2d.diagram import Diagram, Index
 from parse_2d.regions import TinyRegion
@@ -27,6 +27,12 @@ class TinyTokenizer(Tokenizer[ST, VT]):
     def starts_on(self, symbol: ST) -> bool:
         return symbol == self.symbol
 
+    def start_symbols(self) -> FrozenSet[ST]:
+        return frozenset({self.symbol})
+
+    def reach(self) -> int:
+        return 0
+
     def extract_token(self, diagram: Diagram[ST], index: Index) -> Token[VT]:
         assert diagram[index] == self.symbol
 
@@ -1,14 +1,34 @@
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass
-from typing import Generic, Iterable, List, TypeVar
+from time import perf_counter
+from typing import (
+    Dict,
+    FrozenSet,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from more_properties import cached_property
 
 from parse_2d.diagram import Diagram, Index
 from parse_2d.regions import Region
+from parse_2d.tokens.budget import WorkBudget, current_budget
+from parse_2d.tokens.coverage import Coverage
+from parse_2d.tokens.stats import TokenizeStats, current_stats
 
 __all__ = [
     "Token",
     "Tokenizer",
+    "TokenizerSet",
     "tokenize",
+    "tokenize_with_starts",
 ]
 
 ST = TypeVar("ST")  # Symbol type
@@ -30,7 +50,18 @@ class Tokenizer(Generic[ST, VT], metaclass=ABCMeta):
     given symbol.
 
     `extract_token(diagram, index)` returns the token generated from the given
-    diagram at the given index.
+    diagram at the given index. Tokenizing raises IndexError if it returns None
+    instead.
+
+    `start_symbols()` optionally returns the collection of all symbols this
+    tokenizer may start on, or None if that collection cannot be declared up
+    front. Tokenizers that declare their symbols can be dispatched to by a
+    single lookup, rather than a call to `starts_on` for every symbol.
+
+    `reach()` optionally returns how far, in cells, outside of a token's region
+    and start index a change to the diagram may alter that token, or None if
+    that distance is unbounded. Tokenizers that declare their reach can be
+    re-run over just the edited part of a diagram.
     """
 
     @abstractmethod
@@ -41,18 +72,260 @@ class Tokenizer(Generic[ST, VT], metaclass=ABCMeta):
     def extract_token(self, diagram: Diagram[ST], index: Index) -> Token[VT]:
         raise NotImplementedError
 
+    def start_symbols(self) -> Optional[FrozenSet[ST]]:
+        return None
+
+    def reach(self) -> Optional[int]:
+        return None
+
+
+@dataclass(frozen=True)
+class TokenizerSet(Generic[ST, VT]):
+    """
+    A list of tokenizers, compiled for dispatching on symbols.
+
+    TokenizerSet(tokenizers)
+
+    Builds a table from each declared start symbol to the tokenizers that start
+    on it, preserving the order of `tokenizers`. Tokenizers that do not declare
+    their start symbols are asked via `starts_on` instead.
+
+    `candidates(symbol)` returns, in order, the tokenizers that start on the
+    given symbol.
+
+    `reach` is the greatest reach of the tokenizers, or None if any of them has
+    unbounded reach.
+    """
+
+    tokenizers: Tuple[Tokenizer[ST, VT], ...]
+
+    @cached_property
+    def declared_symbols(self) -> Tuple[Optional[FrozenSet[ST]], ...]:
+        declared_symbols = []
+
+        for tokenizer in self.tokenizers:
+            symbols = tokenizer.start_symbols()
+
+            if symbols is not None:
+                symbols = frozenset(
+                    symbol for symbol in symbols if tokenizer.starts_on(symbol)
+                )
+
+            declared_symbols.append(symbols)
+
+        return tuple(declared_symbols)
+
+    @cached_property
+    def dispatch_table(self) -> Dict[ST, Tuple[Tokenizer[ST, VT], ...]]:
+        table = {}
+
+        for tokenizer, symbols in zip(self.tokenizers, self.declared_symbols):
+            for symbol in symbols or ():
+                table[symbol] = table.get(symbol, ()) + (tokenizer,)
+
+        return table
+
+    @cached_property
+    def is_fully_declared(self) -> bool:
+        return None not in self.declared_symbols
+
+    @cached_property
+    def reach(self) -> Optional[int]:
+        reaches = [tokenizer.reach() for tokenizer in self.tokenizers]
+
+        if None in reaches:
+            return None
+
+        return max(reaches, default=0)
+
+    def candidates(self, symbol: ST) -> Sequence[Tokenizer[ST, VT]]:
+        if self.is_fully_declared:
+            return self.dispatch_table.get(symbol, ())
+
+        return [
+            tokenizer
+            for tokenizer, symbols in zip(self.tokenizers, self.declared_symbols)
+            if (tokenizer.starts_on(symbol) if symbols is None else symbol in symbols)
+        ]
+
+    @classmethod
+    def compile(
+        cls, tokenizers: Union["TokenizerSet[ST, VT]", Iterable[Tokenizer[ST, VT]]]
+    ) -> "TokenizerSet[ST, VT]":
+        if isinstance(tokenizers, cls):
+            return tokenizers
+
+        return cls(tuple(tokenizers))
+
+
+def missing_token(tokenizer: Tokenizer[ST, VT], index: Index) -> IndexError:
+    return IndexError(f"{type(tokenizer).__name__} found no token at index {index!r}")
+
 
 def tokenize(
-    diagram: Diagram[ST], tokenizers: List[Tokenizer[ST, VT]],
+    diagram: Diagram[ST],
+    tokenizers: Union[TokenizerSet[ST, VT], List[Tokenizer[ST, VT]]],
+    stats: Optional[TokenizeStats] = None,
+    budget: Optional[WorkBudget] = None,
 ) -> Iterable[Token[VT]]:
-    diagram_coverage = set()
+    for index, tokenizer, token in extract_tokens(diagram, tokenizers, stats, budget):
+        yield token
+
 
-    for index, value in diagram.items():
-        if index in diagram_coverage:
-            continue
+def tokenize_with_starts(
+    diagram: Diagram[ST],
+    tokenizers: Union[TokenizerSet[ST, VT], List[Tokenizer[ST, VT]]],
+    stats: Optional[TokenizeStats] = None,
+    budget: Optional[WorkBudget] = None,
+) -> Iterator[Tuple[Index, Token[VT]]]:
+    """
+    Tokenize the diagram, yielding each token with the index it was extracted
+    from
+
+    If `stats` is given, records the work done by each tokenizer in it.
+
+    If `budget` is given, raises `BudgetExceeded` once the work done exceeds it.
+    """
 
-        for tokenizer in tokenizers:
-            if tokenizer.starts_on(value):
+    return (
+        (index, token)
+        for index, tokenizer, token in extract_tokens(
+            diagram, tokenizers, stats, budget
+        )
+    )
+
+
+def extract_tokens(
+    diagram: Diagram[ST],
+    tokenizers: Union[TokenizerSet[ST, VT], List[Tokenizer[ST, VT]]],
+    stats: Optional[TokenizeStats] = None,
+    budget: Optional[WorkBudget] = None,
+) -> Iterator[Tuple[Index, Tokenizer[ST, VT], Token[VT]]]:
+    """
+    As `tokenize_with_starts`, also yielding the tokenizer of each token
+    """
+
+    tokenizer_set = TokenizerSet.compile(tokenizers)
+
+    if tokenizer_set.is_fully_declared and diagram.symbol_index is not None:
+        cells = diagram.symbol_index.items(tokenizer_set.dispatch_table)
+    else:
+        cells = diagram.items()
+
+    if stats is not None or budget is not None:
+        return scan_instrumented(diagram, tokenizer_set, cells, stats, budget)
+
+    return scan(diagram, tokenizer_set, cells)
+
+
+def scan(
+    diagram: Diagram[ST],
+    tokenizer_set: TokenizerSet[ST, VT],
+    cells: Iterable[Tuple[Index, ST]],
+) -> Iterator[Tuple[Index, Tokenizer[ST, VT], Token[VT]]]:
+    """
+    Extract tokens from the given cells of the diagram, in order, skipping cells
+    covered by tokens already extracted
+    """
+
+    dispatch_table = tokenizer_set.dispatch_table
+    candidates = tokenizer_set.candidates
+    is_fully_declared = tokenizer_set.is_fully_declared
+    diagram_coverage = Coverage()
+
+    with diagram.deriving():
+        for index, value in cells:
+            if index in diagram_coverage:
+                continue
+
+            if is_fully_declared:
+                tokenizers_for_value = dispatch_table.get(value, ())
+            else:
+                tokenizers_for_value = candidates(value)
+
+            for tokenizer in tokenizers_for_value:
                 token = tokenizer.extract_token(diagram, index)
-                diagram_coverage |= set(list(token.region))
-                yield token
+
+                if token is None:
+                    raise missing_token(tokenizer, index)
+
+                diagram_coverage.add(token.region)
+                yield index, tokenizer, token
+
+
+def scan_instrumented(
+    diagram: Diagram[ST],
+    tokenizer_set: TokenizerSet[ST, VT],
+    cells: Iterable[Tuple[Index, ST]],
+    stats: Optional[TokenizeStats],
+    budget: Optional[WorkBudget],
+) -> Iterator[Tuple[Index, Tokenizer[ST, VT], Token[VT]]]:
+    """
+    As `scan`, recording the work done by each tokenizer in `stats`, and
+    spending it from `budget`
+    """
+
+    if budget is not None:
+        budget.start()
+
+    # Only installed for tokenizers to record to, if given
+    context_stats = stats
+
+    if stats is None:
+        stats = TokenizeStats()
+
+    tokenizer_stats = {
+        id(tokenizer): stats[tokenizer] for tokenizer in tokenizer_set.tokenizers
+    }
+    undeclared_stats = [
+        stats[tokenizer]
+        for tokenizer, symbols in zip(
+            tokenizer_set.tokenizers, tokenizer_set.declared_symbols
+        )
+        if symbols is None
+    ]
+    diagram_coverage = Coverage()
+
+    with diagram.deriving():
+        for index, value in cells:
+            if index in diagram_coverage:
+                continue
+
+            if budget is not None:
+                budget.spend()
+
+            for undeclared_tokenizer_stats in undeclared_stats:
+                undeclared_tokenizer_stats.starts_on_calls += 1
+
+            for tokenizer in tokenizer_set.candidates(value):
+                extract_stats = tokenizer_stats[id(tokenizer)]
+                extract_stats.extract_calls += 1
+
+                if context_stats is not None:
+                    stats_token = current_stats.set(context_stats)
+
+                if budget is not None:
+                    budget_token = current_budget.set(budget)
+
+                start_time = perf_counter()
+
+                try:
+                    token = tokenizer.extract_token(diagram, index)
+
+                    if token is None:
+                        raise missing_token(tokenizer, index)
+                except Exception:
+                    extract_stats.extract_failures += 1
+                    raise
+                finally:
+                    extract_stats.time += perf_counter() - start_time
+
+                    if context_stats is not None:
+                        current_stats.reset(stats_token)
+
+                    if budget is not None:
+                        current_budget.reset(budget_token)
+
+                extract_stats.cells_covered += len(token.region)
+                diagram_coverage.add(token.region)
+                yield index, tokenizer, token
@@ -1,8 +1,24 @@
-from collections import deque
-from dataclasses import dataclass
-from typing import FrozenSet, Mapping, Optional, TypeVar
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from inspect import signature
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
-from parse_2d.diagram import Diagram, Index
+from more_properties import cached_property
+
+from parse_2d.diagram import BaseDiagram, Diagram, Index, TextDiagram
+from parse_2d.tokens.budget import current_budget
+from parse_2d.tokens.stats import record
 from parse_2d.tokens.translation import Directions, Translation
 from parse_2d.tokens.types import Token, Tokenizer
 
@@ -10,6 +26,12 @@ __all__ = ["WireSocket", "Wire", "WireTokenizer"]
 
 ST = TypeVar("ST")  # Symbol type
 
+# Bit of a connection mask set for segments, with the bits of each direction
+# above it
+SEGMENT = 1
+
+SYMBOL_RUN = re.compile(r"(.)\1*", re.DOTALL)
+
 
 @dataclass(frozen=True)
 class WireSocket:
@@ -27,6 +49,109 @@ class Wire:
     sockets: FrozenSet[WireSocket]
 
 
+class ConnectionMasks(Dict[Index, int]):
+    """
+    The symbol mask of each cell of a diagram, computed when first looked up,
+    with whitespace cells having no connections
+
+    ConnectionMasks(diagram, tokenizer)
+
+    `fill()` computes the mask of every non-whitespace cell in one pass.
+    """
+
+    def __init__(self, diagram: BaseDiagram[ST], tokenizer: "WireTokenizer[ST]"):
+        super().__init__()
+        self.diagram = diagram
+        self.tokenizer = tokenizer
+
+    def __missing__(self, index: Index) -> int:
+        symbol = self.diagram[index]
+
+        if symbol == self.diagram.whitespace:
+            mask = 0
+        else:
+            mask = self.tokenizer.symbol_mask(symbol)
+
+        self[index] = mask
+
+        return mask
+
+    def fill(self) -> "ConnectionMasks":
+        symbol_mask = self.tokenizer.symbol_mask
+
+        for index, symbol in self.diagram.items():
+            if index not in self:
+                self[index] = symbol_mask(symbol)
+
+        return self
+
+
+@dataclass
+class SymbolRuns:
+    """
+    Runs of a repeated symbol along the rows and columns of a text diagram
+
+    SymbolRuns(diagram)
+
+    The runs of each row are found by a regular expression scan of the row,
+    when first needed. Column runs are found by stepping along the column from
+    the given cell, so only the rows of the run itself are read.
+
+    `row_run(x, y)` and `column_run(x, y)` return the start and end, excluded,
+    of the run containing the given cell.
+    """
+
+    diagram: TextDiagram
+    row_runs: Dict[int, Tuple[List[int], List[int]]] = field(default_factory=dict)
+
+    @staticmethod
+    def line_runs(line: str) -> Tuple[List[int], List[int]]:
+        starts = []
+        ends = []
+
+        for match in SYMBOL_RUN.finditer(line):
+            starts.append(match.start())
+            ends.append(match.end())
+
+        return starts, ends
+
+    @staticmethod
+    def run_at(runs: Tuple[List[int], List[int]], position: int) -> Tuple[int, int]:
+        starts, ends = runs
+        i = bisect_right(starts, position) - 1
+
+        return starts[i], ends[i]
+
+    def row_run(self, x: int, y: int) -> Tuple[int, int]:
+        try:
+            runs = self.row_runs[y]
+        except KeyError:
+            runs = self.row_runs[y] = self.line_runs(self.diagram.contents[y])
+
+        return self.run_at(runs, x)
+
+    def column_symbol(self, x: int, y: int) -> Optional[str]:
+        try:
+            row = self.diagram.contents[y]
+        except IndexError:
+            return None
+
+        return row[x] if x < len(row) else None
+
+    def column_run(self, x: int, y: int) -> Tuple[int, int]:
+        symbol = self.column_symbol(x, y)
+        start = y
+        end = y + 1
+
+        while start > 0 and self.column_symbol(x, start - 1) == symbol:
+            start -= 1
+
+        while self.column_symbol(x, end) == symbol:
+            end += 1
+
+        return start, end
+
+
 @dataclass(frozen=True)
 class WireTokenizer(Tokenizer[ST, Wire]):
     """
@@ -46,9 +171,36 @@ class WireTokenizer(Tokenizer[ST, Wire]):
     to all possible outgoing directions.
     Child classes may override this behaviour by overriding `connections`:
 
-    `connections(segment, incoming_direction=None)`
+    `connections(segment, incoming_direction=None, state=None)`
     Returns all of the segment's outgoing directions, restricted to those
     available from the incoming direction, if given.
+    Directions must be either in `Directions`, or in `segment_connections`.
+    Overrides need not take the `state` parameter.
+
+    Child classes that record information while walking a wire keep it in a
+    state object for each extraction, rather than on the tokenizer, so that
+    tokenizers stay safe to share between threads:
+
+    `new_state()`
+    Returns the state for a new extraction, passed to `connections`, while
+    walking the wire, and `wire_value`. Defaults to None.
+
+    `wire_value(sockets, state)`
+    Returns the value of the extracted token, from the wire's sockets, and the
+    state after walking it.
+
+    Wires are walked over the connection mask of each cell, holding a bit for
+    each direction the cell's symbol connects to, and whether it is a segment.
+    The masks are computed from `connections(segment)`, without an incoming
+    direction, and `is_segment`, so these must depend only on the symbol.
+    Unless `connections` is overridden, straight runs of identical segments
+    are stepped over in one go, only walking their ends.
+
+    `extract_all(diagram)` returns the tokens `tokenize(diagram, [tokenizer])`
+    yields, in a single pass over the diagram. Unless `starts_on`, `is_segment`
+    or `connections` is overridden, the wires are found by merging each
+    segment with its connected neighbours, rather than walking each wire from
+    its start.
     """
 
     segment_connections: Mapping[ST, FrozenSet[Translation]]
@@ -56,39 +208,453 @@ class WireTokenizer(Tokenizer[ST, Wire]):
     def starts_on(self, value: ST) -> bool:
         return value in self.segment_connections
 
+    def start_symbols(self) -> FrozenSet[ST]:
+        return frozenset(self.segment_connections)
+
+    def reach(self) -> int:
+        return max(
+            (
+                max(abs(direction.x), abs(direction.y))
+                for directions in self.segment_connections.values()
+                for direction in directions
+            ),
+            default=1,
+        )
+
+    @cached_property
+    def directions(self) -> List[Translation]:
+        directions = list(Directions.all)
+
+        for segment_directions in self.segment_connections.values():
+            for direction in segment_directions:
+                for new_direction in (direction, -direction):
+                    if new_direction not in directions:
+                        directions.append(new_direction)
+
+        return directions
+
+    @cached_property
+    def direction_bits(self) -> Dict[Translation, int]:
+        return {direction: 1 << (i + 1) for i, direction in enumerate(self.directions)}
+
+    @cached_property
+    def symbol_masks(self) -> Dict[ST, int]:
+        return {}
+
+    def direction_mask(self, directions: Iterable[Translation]) -> int:
+        direction_bits = self.direction_bits
+        mask = 0
+
+        for direction in directions:
+            mask |= direction_bits[direction]
+
+        return mask
+
+    def symbol_mask(self, symbol: ST) -> int:
+        """
+        Mask of the bits of the symbol's connections, and whether it is a segment
+        """
+
+        try:
+            return self.symbol_masks[symbol]
+        except KeyError:
+            mask = self.direction_mask(self.connections(symbol))
+
+            if self.is_segment(symbol):
+                mask |= SEGMENT
+
+            self.symbol_masks[symbol] = mask
+
+            return mask
+
+    @cached_property
+    def offsets(self) -> List[Tuple[int, int]]:
+        return [(direction.x, direction.y) for direction in self.directions]
+
+    @cached_property
+    def direction_indices(self) -> Dict[Translation, int]:
+        return {direction: i for i, direction in enumerate(self.directions)}
+
+    @cached_property
+    def opposites(self) -> List[int]:
+        return [self.direction_indices[-direction] for direction in self.directions]
+
+    @cached_property
+    def mask_directions(self) -> Dict[int, List[int]]:
+        return {}
+
+    def outgoing(self, mask: int) -> List[int]:
+        """
+        The indices of the directions in the mask
+        """
+
+        try:
+            return self.mask_directions[mask]
+        except KeyError:
+            directions = self.mask_directions[mask] = [
+                i for i, bit in enumerate(self.direction_bits.values()) if mask & bit
+            ]
+
+            return directions
+
+    @cached_property
+    def mask_axes(self) -> Dict[int, Optional[int]]:
+        return {}
+
+    def straight_axis(self, mask: int) -> Optional[int]:
+        """
+        The index of the forward direction of a mask that connects straight
+        through, in a direction and its opposite, and nothing else
+        """
+
+        try:
+            return self.mask_axes[mask]
+        except KeyError:
+            pass
+
+        outgoing = self.outgoing(mask)
+        axis = None
+
+        if len(outgoing) == 2 and self.opposites[outgoing[0]] == outgoing[1]:
+            axis = max(
+                outgoing, key=lambda i: (self.directions[i].y, self.directions[i].x)
+            )
+
+        self.mask_axes[mask] = axis
+
+        return axis
+
+    def straight_run(
+        self, diagram: BaseDiagram[ST], masks: ConnectionMasks, index: Index, axis: int
+    ) -> Tuple[Index, int]:
+        """
+        The first cell, and length, of the run of cells with the same mask as
+        the given cell, along the given axis
+        """
+
+        x, y = index
+        dx, dy = self.offsets[axis]
+
+        if isinstance(diagram, TextDiagram) and (dx, dy) in ((1, 0), (0, 1)):
+            symbol_runs = diagram.derive(SymbolRuns, lambda: SymbolRuns(diagram))
+
+            if dy == 0:
+                start, end = symbol_runs.row_run(x, y)
+
+                return (start, y), end - start
+
+            start, end = symbol_runs.column_run(x, y)
+
+            return (x, start), end - start
+
+        mask = masks[index]
+        start_x, start_y = x, y
+        length = 1
+
+        while masks[start_x - dx, start_y - dy] == mask:
+            start_x, start_y = start_x - dx, start_y - dy
+            length += 1
+
+        while masks[x + dx, y + dy] == mask:
+            x, y = x + dx, y + dy
+            length += 1
+
+        return (start_x, start_y), length
+
+    def run_steps(
+        self,
+        diagram: BaseDiagram[ST],
+        masks: ConnectionMasks,
+        index: Index,
+        axis: int,
+        runs: List[Tuple[Index, int, int]],
+    ) -> Tuple[Tuple[Index, List[int]], Tuple[Index, List[int]]]:
+        """
+        Record the straight run through the index, and return the steps out of
+        either end of it
+        """
+
+        start, length = self.straight_run(diagram, masks, index, axis)
+        runs.append((start, axis, length))
+
+        start_x, start_y = start
+        dx, dy = self.offsets[axis]
+        end = start_x + (length - 1) * dx, start_y + (length - 1) * dy
+
+        return (start, [self.opposites[axis]]), (end, [axis])
+
+    def connection_masks(self, diagram: BaseDiagram[ST]) -> ConnectionMasks:
+        """
+        The symbol masks of the cells of the diagram, computed as they are looked
+        up, for a single extraction
+        """
+
+        return ConnectionMasks(diagram, self)
+
+    @cached_property
+    def connections_take_state(self) -> bool:
+        return "state" in signature(self.connections).parameters
+
     def is_segment(self, value: ST) -> bool:
         return value in self.segment_connections
 
     def connections(
-        self, segment: ST, incoming_direction: Optional[Translation] = None
+        self,
+        segment: ST,
+        incoming_direction: Optional[Translation] = None,
+        state: Any = None,
     ) -> FrozenSet[Translation]:
         return self.segment_connections.get(segment, Directions.all)
 
-    def extract_token(self, diagram: Diagram[ST], index: Index) -> Token[Wire]:
-        connections_border = deque([(index, None)])
+    def new_state(self) -> Any:
+        return None
+
+    def wire_value(self, sockets: FrozenSet[WireSocket], state: Any) -> Wire:
+        return Wire(sockets)
+
+    def extract_token(
+        self, diagram: Diagram[ST], index: Index, state: Any = None
+    ) -> Token[Wire]:
+        """
+        Extract the wire at the index, walking it with the given state, or a new
+        state if not given
+        """
+
+        if state is None:
+            state = self.new_state()
+
+        masks = self.connection_masks(diagram)
+        directions = self.directions
+        direction_indices = self.direction_indices
+        offsets = self.offsets
+        opposites = self.opposites
+        bits = list(self.direction_bits.values())
+        fixed_connections = type(self).connections is WireTokenizer.connections
+        connections_take_state = self.connections_take_state
+
+        connections_border = [(index, None)]
         visited_connections = set()
         sockets = set()
 
+        # Straight runs of segments, walked in one step, as the first cell, the
+        # direction along the run, and the length
+        runs = []
+        run_ends = set()
+
+        expansions = 0
+        budget = current_budget.get()
+
         while connections_border:
-            i, incoming_direction = connections_border.pop()
-            symbol = diagram[i]
+            i, incoming = connections_border.pop()
+            x, y = i
 
-            for direction in self.connections(symbol, incoming_direction):
-                adj_i = i + direction
-                adj_symbol = diagram[adj_i]
-                connection = adj_i, -direction
+            if fixed_connections:
+                mask = masks[i]
+                axis = self.straight_axis(mask)
 
-                if connection in visited_connections:
-                    continue
+                if axis is not None:
+                    dx, dy = offsets[axis]
 
-                if adj_symbol == diagram.whitespace:
-                    continue
+                    if masks[x + dx, y + dy] == mask or masks[x - dx, y - dy] == mask:
+                        if i in run_ends:
+                            continue
+
+                        steps = self.run_steps(diagram, masks, i, axis, runs)
+                        start, end = steps[0][0], steps[1][0]
+                        run_ends.update((start, end))
+                        visited_connections.add((start, opposites[axis]))
+                        visited_connections.add((end, axis))
+
+                        if budget is not None:
+                            budget.spend(runs[-1][2])
+                    else:
+                        steps = ((i, self.outgoing(mask)),)
+                else:
+                    steps = ((i, self.outgoing(mask)),)
+            else:
+                incoming_direction = None if incoming is None else directions[incoming]
+
+                if connections_take_state:
+                    connections = self.connections(
+                        diagram[i], incoming_direction, state
+                    )
+                else:
+                    connections = self.connections(diagram[i], incoming_direction)
+
+                steps = (
+                    (i, [direction_indices[direction] for direction in connections]),
+                )
+
+            for i, outgoing in steps:
+                x, y = i
+                expansions += 1
+
+                if budget is not None:
+                    budget.spend(len(outgoing))
+
+                for direction in outgoing:
+                    dx, dy = offsets[direction]
+                    adj_i = x + dx, y + dy
+                    opposite = opposites[direction]
+                    connection = adj_i, opposite
+
+                    if connection in visited_connections:
+                        continue
 
-                if -direction in self.connections(adj_symbol):
-                    if self.is_segment(adj_symbol):
+                    adj_mask = masks[adj_i]
+
+                    if not adj_mask & bits[opposite]:
+                        continue
+
+                    if adj_mask & SEGMENT:
                         connections_border.append(connection)
                         visited_connections.add(connection)
                     else:
-                        sockets.add(WireSocket(*connection))
+                        sockets.add(WireSocket(adj_i, directions[opposite]))
+
+        record(self, "expansions", expansions)
+
+        region = {i for i, _ in visited_connections}
+
+        for (start_x, start_y), axis, length in runs:
+            dx, dy = offsets[axis]
+            region.update(
+                (start_x + step * dx, start_y + step * dy) for step in range(length)
+            )
+
+        return Token(region, self.wire_value(frozenset(sockets), state))
+
+    def extract_all(self, diagram: BaseDiagram[ST]) -> List[Token[Wire]]:
+        if any(
+            getattr(type(self), method) is not getattr(WireTokenizer, method)
+            for method in ("starts_on", "is_segment", "connections")
+        ):
+            return self.walk_all(diagram)
+
+        masks = self.connection_masks(diagram).fill()
+        budget = current_budget.get()
+
+        directions = self.directions
+        direction_bits = [self.direction_bits[direction] for direction in directions]
+        opposite_bits = [self.direction_bits[-direction] for direction in directions]
+
+        # Directions that are after the start of a cell, in row-major order, so
+        # each pair of neighbours is considered once
+        forward = [
+            i
+            for i, direction in enumerate(directions)
+            if (direction.y, direction.x) > (0, 0)
+        ]
+
+        parents = {}
+        sizes = {}
+
+        def find(index: Index) -> Index:
+            parent = parents.get(index, index)
+
+            while parent != index:
+                grandparent = parents.get(parent, parent)
+                parents[index] = grandparent
+                index, parent = parent, grandparent
+
+            return index
+
+        segments = [(index, mask) for index, mask in masks.items() if mask & SEGMENT]
+
+        for index, mask in segments:
+            if budget is not None:
+                budget.spend()
+
+            x, y = index
+
+            for i in forward:
+                if not mask & direction_bits[i]:
+                    continue
+
+                direction = directions[i]
+                adj_i = x + direction.x, y + direction.y
+                adj_mask = masks.get(adj_i, 0)
+
+                if not adj_mask & SEGMENT or not adj_mask & opposite_bits[i]:
+                    continue
+
+                root, adj_root = find(index), find(adj_i)
+
+                if root == adj_root:
+                    continue
+
+                size, adj_size = sizes.get(root, 1), sizes.get(adj_root, 1)
+
+                if size < adj_size:
+                    root, adj_root = adj_root, root
+
+                parents[adj_root] = root
+                sizes[root] = size + adj_size
+
+        regions = {}
+        sockets = {}
+
+        for index, mask in segments:
+            root = find(index)
+            regions.setdefault(root, set()).add(index)
+            root_sockets = sockets.setdefault(root, set())
+            x, y = index
+
+            for i, direction in enumerate(directions):
+                if not mask & direction_bits[i]:
+                    continue
+
+                adj_i = x + direction.x, y + direction.y
+                adj_mask = masks.get(adj_i, 0)
+
+                if adj_mask & opposite_bits[i] and not adj_mask & SEGMENT:
+                    root_sockets.add(WireSocket(adj_i, -direction))
+
+        tokens = []
+        extracted = set()
+
+        for index, symbol in diagram.items():
+            if not self.starts_on(symbol):
+                continue
+
+            root = find(index)
+
+            if root in extracted:
+                continue
+
+            region = regions.get(root, set())
+
+            if len(region) > 1:
+                extracted.add(root)
+            else:
+                # A lone segment covers no cells, so is extracted every time
+                region = set()
+
+            tokens.append(
+                Token(
+                    region,
+                    self.wire_value(frozenset(sockets.get(root, ())), self.new_state()),
+                )
+            )
+
+        return tokens
+
+    def walk_all(self, diagram: BaseDiagram[ST]) -> List[Token[Wire]]:
+        """
+        Extract every wire in scan order by walking it, as `connections` may
+        depend on the incoming direction
+        """
+
+        tokens = []
+        covered = set()
+
+        with diagram.deriving():
+            for index, symbol in diagram.items():
+                if index in covered or not self.starts_on(symbol):
+                    continue
+
+                token = self.extract_token(diagram, index)
+                covered.update(token.region)
+                tokens.append(token)
 
-        return Token({i for i, _ in visited_connections}, Wire(frozenset(sockets)))
+        return tokens
@@ -70,6 +70,8 @@ def parse_connection_label(label: str) -> ConnectionLabel:
 def parse_circuit_diagram(diagram: Diagram[str]):
     node_ids = count()
 
+    diagram.index_symbols()
+
     functions = {
         function.name: function
         for function in parse_function_defs(diagram, parse_circuit_diagram)
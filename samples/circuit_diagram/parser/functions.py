@@ -1,7 +1,13 @@
 from datetime import datetime
 from typing import Callable, Dict, Iterable, Iterator, List
 
-from parse_2d import Diagram, Index, TemplateTokenizer, tokenize
+from parse_2d import (
+    Diagram,
+    Index,
+    MultiTemplateTokenizer,
+    TemplateTokenizer,
+    tokenize,
+)
 from samples.circuit_diagram.ast import (
     Circuit,
     FuncNode,
@@ -63,16 +69,16 @@ def parse_function_defs(
         elif diagram[(0, y)] == "}":
             y_end = y
 
+            _, (width, _) = diagram.bounds
+
             yield Function(
                 "".join(diagram.contents[y_start][1:]),
                 parse_function_contents(
-                    Diagram(diagram.contents[y_start + 1 : y_end], diagram.whitespace)
+                    diagram[(0, y_start + 1) : (width, y_end)].copy()
                 ),
             )
 
-            diagram.contents[y_start : y_end + 1] = [
-                [] for _ in range(y_end - y_start + 1)
-            ]
+            del diagram[(0, y_start) : (width, y_end + 1)]
 
 
 def parse_functions(
@@ -82,9 +88,11 @@ def parse_functions(
         user_function_tokenizer(function) for function in user_functions
     ]
 
+    tokenizer = MultiTemplateTokenizer(function_tokenizers + user_function_tokenizers)
+
     functions_by_region = {
         token.region: FuncNode(next(node_ids), *token.value)
-        for token in tokenize(diagram, function_tokenizers + user_function_tokenizers)
+        for token in tokenize(diagram, [tokenizer])
     }
 
     functions_by_index = {
@@ -9,9 +9,7 @@ __all__ = ["parse_input_nodes", "parse_output_nodes"]
 def parse_input_nodes(
     diagram: Diagram[str], node_ids: Iterator[int]
 ) -> Dict[Index, InputNode]:
-    input_indices = [
-        (0, y) for y in range(len(diagram.contents)) if diagram[(0, y)] == "-"
-    ]
+    input_indices = [index for index in diagram.positions_of("-") if index[0] == 0]
 
     for input_index in input_indices:
         diagram[input_index] = "-input"
@@ -1,14 +1,13 @@
 from collections import deque
 from dataclasses import dataclass, field
-from typing import Deque, FrozenSet, List, Optional
+from typing import Any, Deque, FrozenSet, List, Optional
 
 from parse_2d import (
     Diagram,
     Directions,
-    Index,
-    Token,
     Translation,
     Wire,
+    WireSocket,
     WireTokenizer,
     tokenize,
 )
@@ -30,12 +29,15 @@ class CrossoverWireTokenizer(WireTokenizer[str]):
         return super().starts_on(value)
 
     def connections(
-        self, segment: str, incoming_direction: Optional[Translation] = None
+        self,
+        segment: str,
+        incoming_direction: Optional[Translation] = None,
+        state: Any = None,
     ) -> FrozenSet[Translation]:
         if segment == "=" and incoming_direction is not None:
             return frozenset({-incoming_direction})
 
-        return super().connections(segment, incoming_direction)
+        return super().connections(segment, incoming_direction, state)
 
 
 label_reading_directions = {
@@ -46,11 +48,17 @@ label_reading_directions = {
 }
 
 
-@dataclass(frozen=True)
-class LabelledWireTokenizer(WireTokenizer[str]):
+@dataclass
+class LabelState:
     labels: List[str] = field(default_factory=list)
     partial_label: Deque[str] = field(default_factory=deque)
 
+
+@dataclass(frozen=True)
+class LabelledWireTokenizer(WireTokenizer[str]):
+    def new_state(self) -> LabelState:
+        return LabelState()
+
     def is_segment(self, value: str) -> bool:
         if value.isalnum() or value == "+":
             return True
@@ -58,41 +66,38 @@ class LabelledWireTokenizer(WireTokenizer[str]):
         return super().is_segment(value)
 
     def connections(
-        self, segment: str, incoming_direction: Optional[Translation] = None
+        self,
+        segment: str,
+        incoming_direction: Optional[Translation] = None,
+        state: Optional[LabelState] = None,
     ) -> FrozenSet[Translation]:
         if incoming_direction is None:
-            return super().connections(segment, incoming_direction)
+            return super().connections(segment, incoming_direction, state)
 
         if segment.isalnum() or segment == "+":
 
             if incoming_direction in label_reading_directions:
-                self.partial_label.appendleft(segment)
+                state.partial_label.appendleft(segment)
             else:
-                self.partial_label.append(segment)
+                state.partial_label.append(segment)
 
             return frozenset({-incoming_direction})
-        elif self.partial_label:
-
-            self.labels.append("".join(self.partial_label))
-            self.partial_label.clear()
+        elif state.partial_label:
 
-        return super().connections(segment, incoming_direction)
+            state.labels.append("".join(state.partial_label))
+            state.partial_label.clear()
 
-    def extract_token(
-        self, diagram: Diagram[str], index: Index
-    ) -> Token[CircuitDiagramWire]:
-        self.partial_label.clear()
-        self.labels.clear()
+        return super().connections(segment, incoming_direction, state)
 
-        wire_token = super().extract_token(diagram, index)
+    def wire_value(
+        self, sockets: FrozenSet[WireSocket], state: LabelState
+    ) -> CircuitDiagramWire:
+        labels = list(state.labels)
 
-        if self.partial_label:
-            self.labels.append("".join(self.partial_label))
+        if state.partial_label:
+            labels.append("".join(state.partial_label))
 
-        return Token(
-            wire_token.region,
-            CircuitDiagramWire(wire_token.value.sockets, frozenset(self.labels)),
-        )
+        return CircuitDiagramWire(sockets, frozenset(labels))
 
 
 @dataclass(frozen=True)
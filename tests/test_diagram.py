@@ -1,6 +1,8 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 
-from parse_2d.diagram import Diagram
+from parse_2d.diagram import Diagram, DiagramView, MappedDiagram, TextDiagram
 
 
 class TestDiagram(TestCase):
@@ -37,6 +39,60 @@ class TestDiagram(TestCase):
     def test_diagram_len(self):
         self.assertEqual(8, len(self.sample_diagram))
 
+    def test_diagram_len_maintained(self):
+        diagram = self.sample_diagram
+        self.assertEqual(8, len(diagram))
+
+        diagram[(1, 1)] = "e"
+        diagram[(0, 0)] = "j"
+        del diagram[(2, 2)]
+        del diagram[(0, 0):(2, 1)]
+        diagram[(1, 1):(2, 3)] = Diagram.from_string("x\ny")
+
+        self.assertEqual(6, len(diagram))
+        self.assertEqual(6, diagram.symbol_count)
+        self.assertEqual(6, sum(1 for _ in diagram.items()))
+
+    def test_diagram_checkpoint(self):
+        diagram = self.sample_diagram
+        self.assertEqual(set(), diagram.checkpoint())
+
+        diagram[(1, 1)] = "e"
+        diagram[(0, 0)] = "a"
+        del diagram[(2, 2)]
+        del diagram[(0, 1):(2, 2)]
+
+        self.assertEqual({(1, 1), (2, 2), (0, 1)}, diagram.checkpoint())
+        self.assertEqual(set(), diagram.checkpoint())
+
+    def test_diagram_derive(self):
+        diagram = self.sample_diagram
+        computed = []
+
+        def compute():
+            computed.append(diagram[(0, 0)])
+            return len(computed)
+
+        self.assertEqual(1, diagram.derive("key", compute))
+        self.assertEqual(2, diagram.derive("key", compute))
+
+        with diagram.deriving():
+            self.assertEqual(3, diagram.derive("key", compute))
+
+            with diagram.deriving():
+                self.assertEqual(3, diagram.derive("key", compute))
+
+            self.assertEqual(3, diagram.derive("key", compute))
+
+            diagram.clear_derived()
+            self.assertEqual(4, diagram.derive("key", compute))
+
+            diagram[(0, 0)] = "j"
+            self.assertEqual(5, diagram.derive("key", compute))
+
+        self.assertIsNone(diagram.derived)
+        self.assertEqual(["a", "a", "a", "a", "j"], computed)
+
     def test_diagram_contains(self):
         self.assertTrue((0, 0) in self.sample_diagram)
         self.assertFalse((1, 1) in self.sample_diagram)
@@ -67,6 +123,26 @@ class TestDiagram(TestCase):
             list("abcdfghi"), list(self.sample_diagram.values()),
         )
 
+    def test_diagram_bounds(self):
+        self.assertEqual(((0, 0), (3, 3)), self.sample_diagram.bounds)
+        self.assertEqual(((0, 0), (4, 2)), Diagram.from_string("a\nbcde").bounds)
+        self.assertEqual(((0, 0), (0, 0)), Diagram.from_string("").bounds)
+
+    def test_diagram_symbol_index(self):
+        diagram = Diagram.from_string("aba\nd a\ngha")
+        symbol_index = diagram.index_symbols()
+
+        self.assertEqual([(0, 0), (2, 0), (2, 1), (2, 2)], diagram.positions_of("a"))
+
+        diagram[(1, 1)] = "a"
+        del diagram[(2, 0)]
+        del diagram[(0, 2):(3, 3)]
+        diagram[(0, 0):(1, 2)] = Diagram.from_string("b\na")
+
+        self.assertEqual([(0, 1), (1, 1), (2, 1)], symbol_index.positions_of("a"))
+        self.assertEqual([(0, 0), (1, 0)], symbol_index.positions_of("b"))
+        self.assertEqual([], symbol_index.positions_of("g"))
+
     def test_diagram_get(self):
         diagram = self.sample_diagram
         sentinel = object()
@@ -75,3 +151,227 @@ class TestDiagram(TestCase):
         self.assertEqual("b", diagram.get((1, 0), sentinel))
         self.assertEqual(None, diagram.get((1, 1)))
         self.assertEqual(sentinel, diagram.get((1, 1), sentinel))
+
+
+class TestDiagramView(TestCase):
+    @property
+    def sample_diagram(self):
+        return Diagram.from_string("abc\nd f\nghi")
+
+    def test_diagram_view_shares_storage(self):
+        diagram = self.sample_diagram
+        view = diagram[(1, 0):(3, 2)]
+
+        self.assertIsInstance(view, DiagramView)
+
+        diagram[(2, 1)] = "j"
+        self.assertEqual("j", view[(1, 1)])
+
+        view[(0, 0)] = "k"
+        self.assertEqual("k", diagram[(1, 0)])
+
+    def test_diagram_view_get_index(self):
+        view = self.sample_diagram[(1, 0):(3, 2)]
+
+        self.assertEqual("b", view[(0, 0)])
+        self.assertEqual(" ", view[(0, 1)])
+        self.assertEqual(" ", view[(2, 0)])
+        self.assertEqual(" ", view[(0, 2)])
+        self.assertEqual(" ", view[(-1, 0)])
+
+    def test_diagram_view_set_out_of_bounds(self):
+        view = self.sample_diagram[(1, 0):(3, 2)]
+
+        with self.assertRaises(IndexError):
+            view[(2, 0)] = "k"
+
+    def test_diagram_view_del(self):
+        diagram = self.sample_diagram
+        view = diagram[(1, 0):(3, 2)]
+
+        del view[(0, 0)]
+        del view[(1, 1):(2, 2)]
+
+        self.assertEqual(Diagram.from_string("a c\nd  \nghi"), diagram)
+
+    def test_diagram_view_nested(self):
+        view = self.sample_diagram[(1, 0):(3, 3)][(1, 1):(5, 5)]
+
+        self.assertEqual(self.sample_diagram, view.parent)
+        self.assertEqual(((2, 1), (3, 3)), (view.top_left, view.bottom_right))
+        self.assertEqual([((0, 0), "f"), ((0, 1), "i")], list(view.items()))
+
+    def test_diagram_view_items(self):
+        self.assertEqual(
+            [((0, 0), "b"), ((1, 0), "c"), ((1, 1), "f")],
+            list(self.sample_diagram[(1, 0):(3, 2)].items()),
+        )
+
+    def test_diagram_view_symbol_index(self):
+        diagram = self.sample_diagram
+        view = diagram[(1, 0):(3, 2)]
+        view.index_symbols()
+
+        view[(0, 1)] = "a"
+
+        self.assertEqual([(0, 0), (1, 1)], diagram.positions_of("a"))
+        self.assertEqual([(0, 1)], view.positions_of("a"))
+
+    def test_diagram_view_derive(self):
+        diagram = self.sample_diagram
+        view = diagram[(1, 0):(3, 2)]
+
+        with view.deriving():
+            self.assertEqual(1, view.derive("key", lambda: 1))
+            self.assertEqual(1, view.derive("key", lambda: 2))
+
+            view.clear_derived()
+            self.assertIsNone(diagram.derived)
+            self.assertEqual(3, view.derive("key", lambda: 3))
+
+            with diagram.deriving():
+                self.assertEqual(3, view.derive("key", lambda: 4))
+
+            self.assertEqual(3, view.derive("key", lambda: 5))
+
+        self.assertIsNone(diagram.derived)
+
+    def test_diagram_view_copy(self):
+        diagram = self.sample_diagram
+        copy = diagram[(1, 0):(3, 2)].copy()
+
+        self.assertEqual(Diagram.from_string("bc\n f"), copy)
+
+        diagram[(1, 0)] = "j"
+        self.assertEqual("b", copy[(0, 0)])
+
+
+class TestTextDiagram(TestCase):
+    @property
+    def sample_diagram(self):
+        return TextDiagram.from_string("abc\nd f\nghi")
+
+    def test_text_diagram_contents(self):
+        self.assertEqual(["abc", "d f", "ghi"], self.sample_diagram.contents)
+
+    def test_text_diagram_get_index(self):
+        diagram = self.sample_diagram
+
+        self.assertEqual("b", diagram[(1, 0)])
+        self.assertEqual(" ", diagram[(1, 1)])
+        self.assertEqual(" ", diagram[(3, 0)])
+        self.assertEqual(" ", diagram[(-1, 0)])
+
+    def test_text_diagram_get_slice(self):
+        self.assertEqual(
+            TextDiagram.from_string("bc\n f"), self.sample_diagram[(1, 0):(3, 2)]
+        )
+
+    def test_text_diagram_set_index(self):
+        diagram = self.sample_diagram
+        diagram[(0, 1)] = "j"
+
+        self.assertEqual(["abc", "j f", "ghi"], diagram.contents)
+
+        with self.assertRaises(IndexError):
+            diagram[(3, 0)] = "k"
+
+        with self.assertRaises(TypeError):
+            diagram[(0, 0)] = "kl"
+
+    def test_text_diagram_set_slice(self):
+        diagram = self.sample_diagram
+        diagram[(2, 0):(3, 3)] = Diagram.from_string("k\nl\nm")
+
+        self.assertEqual(["abk", "d l", "ghm"], diagram.contents)
+
+    def test_text_diagram_del(self):
+        diagram = self.sample_diagram
+        del diagram[(1, 0)]
+        del diagram[(0, 2):(2, 3)]
+
+        self.assertEqual(["a c", "d f", "  i"], diagram.contents)
+
+    def test_text_diagram_items(self):
+        self.assertEqual(
+            list(Diagram.from_string("abc\nd f\nghi").items()),
+            list(self.sample_diagram.items()),
+        )
+
+    def test_text_diagram_symbol_index(self):
+        diagram = self.sample_diagram
+        diagram.index_symbols()
+
+        diagram[(1, 1)] = "a"
+        del diagram[(0, 0)]
+
+        self.assertEqual([(1, 1)], diagram.positions_of("a"))
+
+    def test_text_diagram_items_sparse_lines(self):
+        s = "a" + " " * 40 + "bc" + " " * 40 + "\n" + " " * 50 + "d"
+
+        self.assertEqual(
+            list(Diagram.from_string(s).items()),
+            list(TextDiagram.from_string(s).items()),
+        )
+        self.assertEqual(
+            [((41, 0), "b"), ((42, 0), "c")],
+            list(TextDiagram.from_string(s).items_within((1, 0), (50, 2))),
+        )
+
+    def test_text_diagram_len(self):
+        diagram = self.sample_diagram
+        self.assertEqual(8, len(diagram))
+
+        diagram[(1, 1)] = "e"
+        del diagram[(0, 0):(2, 2)]
+
+        self.assertEqual(5, len(diagram))
+
+
+class TestMappedDiagram(TestCase):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        self.path = Path(directory.name) / "diagram.txt"
+        self.path.write_text("abc\nd f\nghi", encoding="utf-8")
+
+    @property
+    def sample_diagram(self):
+        diagram = Diagram.from_file(self.path)
+        self.addCleanup(diagram.close)
+
+        return diagram
+
+    def test_mapped_diagram_from_file(self):
+        self.assertIsInstance(self.sample_diagram, MappedDiagram)
+
+    def test_mapped_diagram_get_index(self):
+        diagram = self.sample_diagram
+
+        self.assertEqual("f", diagram[(2, 1)])
+        self.assertEqual(" ", diagram[(1, 1)])
+        self.assertEqual(" ", diagram[(0, 3)])
+        self.assertEqual(" ", diagram[(-1, 0)])
+
+    def test_mapped_diagram_get_slice(self):
+        self.assertEqual(
+            TextDiagram.from_string("bc\n f"), self.sample_diagram[(1, 0):(3, 2)]
+        )
+
+    def test_mapped_diagram_set_index(self):
+        diagram = self.sample_diagram
+        diagram[(0, 1)] = "j"
+
+        self.assertEqual("j", diagram[(0, 1)])
+        self.assertEqual("abc\nd f\nghi", self.path.read_text(encoding="utf-8"))
+
+    def test_mapped_diagram_items(self):
+        self.assertEqual(
+            list(Diagram.from_string("abc\nd f\nghi").items()),
+            list(self.sample_diagram.items()),
+        )
+
+    def test_mapped_diagram_bounds(self):
+        self.assertEqual(((0, 0), (3, 3)), self.sample_diagram.bounds)
@@ -0,0 +1,70 @@
+from pathlib import Path
+from pickle import dumps, loads
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from parse_2d.mapped_lines import MappedLines
+
+
+class TestMappedLines(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def mapped_lines(self, contents: bytes, **kwargs) -> MappedLines:
+        path = Path(self.directory.name) / "diagram.txt"
+        path.write_bytes(contents)
+
+        lines = MappedLines(path, **kwargs)
+        self.addCleanup(lines.close)
+
+        return lines
+
+    def test_mapped_lines_match_splitlines(self):
+        for contents in ["", "a", "a\n", "ab\nc", "ab\r\nc\r\n", "\n\nd\n", "─┐\n└"]:
+            with self.subTest(contents=contents):
+                lines = self.mapped_lines(contents.encode("utf-8"))
+
+                self.assertEqual(contents.splitlines(), list(lines))
+                self.assertEqual(len(contents.splitlines()), len(lines))
+
+    def test_mapped_lines_lazy_index(self):
+        lines = self.mapped_lines(b"ab\ncd\nef\ngh")
+
+        self.assertEqual("cd", lines[1])
+        self.assertEqual(3, len(lines.offsets))
+        self.assertFalse(lines.is_indexed)
+
+        self.assertEqual("gh", lines[-1])
+        self.assertTrue(lines.is_indexed)
+
+    def test_mapped_lines_out_of_range(self):
+        lines = self.mapped_lines(b"ab\ncd")
+
+        with self.assertRaises(IndexError):
+            lines[2]
+
+    def test_mapped_lines_cache_size(self):
+        lines = self.mapped_lines(b"ab\ncd\nef", cache_size=2)
+
+        self.assertEqual(["ab", "cd", "ef"], lines[0:3])
+        self.assertEqual([1, 2], list(lines.cache))
+
+    def test_mapped_lines_set(self):
+        lines = self.mapped_lines(b"ab\ncd")
+        lines[1] = "xy"
+
+        self.assertEqual(["ab", "xy"], list(lines))
+
+        with self.assertRaises(IndexError):
+            lines[2] = "zw"
+
+    def test_mapped_lines_pickle(self):
+        lines = self.mapped_lines(b"ab\ncd\nef")
+        lines[1] = "xy"
+
+        unpickled = loads(dumps(lines))
+        self.addCleanup(unpickled.close)
+
+        self.assertEqual(["ab", "xy", "ef"], list(unpickled))
+        self.assertLess(len(dumps(lines)), 200)
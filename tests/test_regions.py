@@ -1,3 +1,4 @@
+import pickle
 from unittest import TestCase
 
 from parse_2d.regions import RectRegion, SparseRegion, TinyRegion
@@ -40,3 +41,14 @@ class TestRegions(TestCase):
 
         self.assertEqual(elements, frozenset(list(region)))
         self.assertEqual(3, len(region))
+
+    def test_regions_pickle(self):
+        regions = [
+            TinyRegion((0, 0)),
+            RectRegion((0, 0), (2, 3)),
+            SparseRegion(frozenset([(0, 0), (1, 1), (2, 3)])),
+        ]
+
+        for region in regions:
+            with self.subTest(region=region):
+                self.assertEqual(region, pickle.loads(pickle.dumps(region)))
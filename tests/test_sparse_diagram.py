@@ -0,0 +1,99 @@
+from unittest import TestCase
+
+from parse_2d import Diagram, TinyRegion
+from parse_2d.sparse_diagram import SparseDiagram
+from parse_2d.tokens import TinyTokenizer, Token, tokenize
+
+
+class TestSparseDiagram(TestCase):
+    @property
+    def sample_diagram(self):
+        return SparseDiagram.from_string("abc\nd f\nghi", tile_size=2)
+
+    def test_sparse_diagram_get_index(self):
+        diagram = self.sample_diagram
+
+        self.assertEqual("b", diagram[(1, 0)])
+        self.assertEqual(" ", diagram[(1, 1)])
+        self.assertEqual(" ", diagram[(-30, 17)])
+
+    def test_sparse_diagram_get_slice(self):
+        self.assertEqual(
+            Diagram.from_string("bc\n f"), self.sample_diagram[(1, 0):(3, 2)]
+        )
+
+    def test_sparse_diagram_set_index(self):
+        diagram = self.sample_diagram
+        diagram[(-5, -7)] = "j"
+
+        self.assertEqual("j", diagram[(-5, -7)])
+        self.assertEqual(((-6, -8), (4, 4)), diagram.bounds)
+
+    def test_sparse_diagram_set_slice(self):
+        diagram = self.sample_diagram
+        diagram[(2, 0):(3, 3)] = Diagram.from_string("k\nl\nm")
+
+        self.assertEqual(Diagram.from_string("abk\nd l\nghm"), diagram)
+
+    def test_sparse_diagram_tiles_released(self):
+        diagram = self.sample_diagram
+        self.assertEqual(4, len(diagram.tiles))
+
+        del diagram[(2, 0)]
+        diagram[(2, 1)] = " "
+
+        self.assertEqual(3, len(diagram.tiles))
+
+        del diagram[(0, 0):(2, 2)]
+
+        self.assertEqual(2, len(diagram.tiles))
+        self.assertEqual(Diagram.from_string("\n\nghi"), diagram)
+
+    def test_sparse_diagram_items(self):
+        self.assertEqual(
+            list(Diagram.from_string("abc\nd f\nghi").items()),
+            list(self.sample_diagram.items()),
+        )
+
+    def test_sparse_diagram_items_within(self):
+        self.assertEqual(
+            [((2, 1), "f"), ((1, 2), "h"), ((2, 2), "i")],
+            list(self.sample_diagram.items_within((1, 1), (3, 5))),
+        )
+
+    def test_sparse_diagram_symbol_index(self):
+        diagram = self.sample_diagram
+        diagram.index_symbols()
+
+        diagram[(-10, -10)] = "a"
+        diagram[(0, 0)] = " "
+
+        self.assertEqual([(-10, -10)], diagram.positions_of("a"))
+
+    def test_sparse_diagram_len(self):
+        self.assertEqual(8, len(self.sample_diagram))
+
+    def test_sparse_diagram_copy(self):
+        diagram = self.sample_diagram
+        copy = diagram.copy()
+        diagram[(0, 0)] = "j"
+
+        self.assertEqual("a", copy[(0, 0)])
+        self.assertEqual(
+            Diagram.from_string("f\ni"), diagram.copy_within((2, 1), (3, 3))
+        )
+
+    def test_tokenize(self):
+        a_obj = object()
+
+        diagram = SparseDiagram(" ")
+        diagram[(-1000, 3)] = "a"
+        diagram[(1000000, -2)] = "a"
+
+        self.assertEqual(
+            [
+                Token(region=TinyRegion(location=(1000000, -2)), value=a_obj),
+                Token(region=TinyRegion(location=(-1000, 3)), value=a_obj),
+            ],
+            list(tokenize(diagram, [TinyTokenizer("a", a_obj)])),
+        )
@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from parse_2d.symbol_index import SymbolIndex
+
+
+class TestSymbolIndex(TestCase):
+    @property
+    def sample_index(self):
+        return SymbolIndex.from_items(
+            [((1, 1), "a"), ((0, 0), "b"), ((2, 0), "a"), ((0, 1), "a"), ((1, 0), " ")],
+            " ",
+        )
+
+    def test_symbol_index_positions_of(self):
+        symbol_index = self.sample_index
+
+        self.assertEqual([(2, 0), (0, 1), (1, 1)], symbol_index.positions_of("a"))
+        self.assertEqual([(0, 0)], symbol_index.positions_of("b"))
+        self.assertEqual([], symbol_index.positions_of(" "))
+        self.assertEqual([], symbol_index.positions_of("c"))
+
+    def test_symbol_index_replace(self):
+        symbol_index = self.sample_index
+
+        self.assertEqual([(2, 0), (0, 1), (1, 1)], symbol_index.positions_of("a"))
+
+        symbol_index.replace((0, 1), "a", "b")
+        symbol_index.replace((0, 0), "b", " ")
+        symbol_index.replace((3, 3), " ", "a")
+
+        self.assertEqual([(2, 0), (1, 1), (3, 3)], symbol_index.positions_of("a"))
+        self.assertEqual([(0, 1)], symbol_index.positions_of("b"))
+
+    def test_symbol_index_items(self):
+        self.assertEqual(
+            [((0, 0), "b"), ((2, 0), "a"), ((0, 1), "a"), ((1, 1), "a")],
+            list(self.sample_index.items(["a", "b", "c"])),
+        )
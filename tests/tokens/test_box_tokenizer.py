@@ -1,7 +1,8 @@
+from random import Random
 from unittest import TestCase
 
 from parse_2d import Diagram, RectRegion, Token
-from parse_2d.tokens import BoxTokenizer, Directions
+from parse_2d.tokens import BoxTokenizer, Directions, tokenize
 
 
 class TestBoxTokenizer(TestCase):
@@ -44,3 +45,99 @@ class TestBoxTokenizer(TestCase):
         self.assertEqual(token, tokenizer.extract_token(self.sample_diagram, (1, 0)))
         self.assertEqual(token, tokenizer.extract_token(self.sample_diagram, (2, 3)))
         self.assertEqual(token, tokenizer.extract_token(self.sample_diagram, (3, 3)))
+
+    def test_box_tokenizer_diagram_written(self):
+        tokenizer = self.sample_box_tokenizer
+        diagram = self.sample_diagram
+        diagram[(2, 3)] = " "
+
+        self.assertIsNone(tokenizer.extract_token(diagram, (0, 0)))
+
+        diagram[(2, 3)] = "─"
+
+        self.assertEqual(
+            Token(
+                region=RectRegion(top_left=(0, 0), bottom_right=(4, 4)), value="ab\ncd"
+            ),
+            tokenizer.extract_token(diagram, (0, 0)),
+        )
+
+    def test_box_tokenizer_contents_edited(self):
+        tokenizer = self.sample_box_tokenizer
+        diagram = self.sample_diagram
+
+        self.assertEqual(1, len(list(tokenize(diagram, [tokenizer]))))
+        self.assertIsNone(diagram.derived)
+
+        # Tables from the last tokenize call are not kept to go stale
+        diagram.contents[0][1] = " "
+
+        with self.assertRaises(IndexError):
+            list(tokenize(diagram, [tokenizer]))
+
+    def test_box_tokenizer_nested_tables(self):
+        diagram = Diagram.from_string(
+            "┌───────┐\n"
+            "│┌────┐ │\n"
+            "││┌─┐ │ │\n"
+            "│││ │ │ │\n"
+            "││└─┘ │ │\n"
+            "│└────┘ │\n"
+            "└───────┘"
+        )
+        tables_kept = []
+
+        def contents_tokenizer(view):
+            width, height = view.size
+            values = [
+                token.value
+                for token in tokenize(
+                    view[(1, 1) : (width - 1, height - 1)], [tokenizer]
+                )
+            ]
+            tables_kept.append(len(diagram.derived))
+
+            return values
+
+        tokenizer = BoxTokenizer(
+            self.sample_box_tokenizer.edge_symbols, contents_tokenizer
+        )
+
+        self.assertEqual(
+            [[[[]]]], [token.value for token in tokenize(diagram, [tokenizer])]
+        )
+
+        # Only the tables of the tokenize calls still running are kept
+        self.assertEqual([3, 2, 1], tables_kept)
+        self.assertIsNone(diagram.derived)
+
+    def test_box_tokenizer_failed_traces(self):
+        random = Random(0)
+        tokenizer = BoxTokenizer(
+            {
+                Directions.UP: frozenset({"-"}),
+                Directions.UP_RIGHT: frozenset({"+"}),
+                Directions.RIGHT: frozenset({"|"}),
+                Directions.DOWN_RIGHT: frozenset({"+"}),
+                Directions.DOWN: frozenset({"-"}),
+                Directions.DOWN_LEFT: frozenset({"+"}),
+                Directions.LEFT: frozenset({"|"}),
+                Directions.UP_LEFT: frozenset({"+"}),
+            },
+            lambda diagram: None,
+        )
+
+        for _ in range(20):
+            text = "\n".join(
+                "".join(random.choice("++-| ") for _ in range(8)) for _ in range(6)
+            )
+            diagram = Diagram.from_string(text)
+
+            with diagram.deriving():
+                for index, symbol in diagram.items():
+                    with self.subTest(diagram=text, index=index):
+                        # Traces from earlier cells fill the tables of `diagram`
+                        self.assertEqual(
+                            tokenizer.extract_token(Diagram.from_string(text), index),
+                            tokenizer.extract_token(diagram, index),
+                        )
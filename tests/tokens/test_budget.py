@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+from parse_2d import Diagram
+from parse_2d.tokens import (
+    BudgetExceeded,
+    Directions,
+    TinyTokenizer,
+    WireTokenizer,
+    WorkBudget,
+    tokenize,
+)
+
+
+class TestWorkBudget(TestCase):
+    @property
+    def sample_tokenizers(self):
+        return [
+            TinyTokenizer("x", 1),
+            WireTokenizer({".": Directions.all}),
+        ]
+
+    def test_work_budget_spend(self):
+        budget = WorkBudget(steps=3)
+        budget.spend(2)
+        budget.spend()
+
+        with self.assertRaises(BudgetExceeded):
+            budget.spend()
+
+    def test_tokenize_within_budget(self):
+        diagram = Diagram.from_string("x...\n  ..\nx   ")
+        tokenizers = self.sample_tokenizers
+        budget = WorkBudget(steps=1000, seconds=60)
+
+        self.assertEqual(
+            list(tokenize(diagram, tokenizers)),
+            list(tokenize(diagram, tokenizers, budget=budget)),
+        )
+        self.assertGreater(budget.steps_taken, 0)
+
+    def test_tokenize_budget_steps(self):
+        diagram = Diagram.from_string("\n".join(["." * 20] * 20))
+
+        with self.assertRaises(BudgetExceeded):
+            list(tokenize(diagram, self.sample_tokenizers, budget=WorkBudget(100)))
+
+    def test_tokenize_budget_seconds(self):
+        diagram = Diagram.from_string("x x x")
+
+        with self.assertRaises(BudgetExceeded):
+            list(
+                tokenize(diagram, self.sample_tokenizers, budget=WorkBudget(seconds=-1))
+            )
@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from parse_2d import RectRegion, SparseRegion, TinyRegion
+from parse_2d.tokens.coverage import CHUNK_WIDTH, Coverage
+
+
+class TestCoverage(TestCase):
+    def test_coverage_empty(self):
+        coverage = Coverage()
+
+        self.assertNotIn((0, 0), coverage)
+        self.assertNotIn((2, 1), coverage)
+
+    def test_coverage_add_rect_region(self):
+        coverage = Coverage()
+        coverage.add(RectRegion((1, 1), (3, 4)))
+
+        self.assertIn((1, 1), coverage)
+        self.assertIn((2, 3), coverage)
+        self.assertNotIn((0, 1), coverage)
+        self.assertNotIn((3, 1), coverage)
+        self.assertNotIn((1, 0), coverage)
+
+    def test_coverage_add_sparse_region(self):
+        coverage = Coverage()
+        coverage.add(SparseRegion(frozenset({(0, 0), (3, 2)})))
+        coverage.add(TinyRegion((1, 3)))
+        coverage.add({(2, 2)})
+
+        self.assertIn((0, 0), coverage)
+        self.assertIn((3, 2), coverage)
+        self.assertIn((1, 3), coverage)
+        self.assertIn((2, 2), coverage)
+        self.assertNotIn((1, 1), coverage)
+
+    def test_coverage_across_chunks(self):
+        coverage = Coverage()
+        coverage.add(RectRegion((-2, -1), (CHUNK_WIDTH + 2, 1)))
+        coverage.add({(10 * CHUNK_WIDTH, 5)})
+
+        self.assertIn((-2, -1), coverage)
+        self.assertIn((CHUNK_WIDTH - 1, 0), coverage)
+        self.assertIn((CHUNK_WIDTH + 1, 0), coverage)
+        self.assertIn((10 * CHUNK_WIDTH, 5), coverage)
+        self.assertNotIn((-3, 0), coverage)
+        self.assertNotIn((CHUNK_WIDTH + 2, 0), coverage)
+        self.assertNotIn((0, 1), coverage)
+
+        self.assertEqual(7, len(coverage.chunks))
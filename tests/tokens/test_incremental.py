@@ -0,0 +1,83 @@
+from random import Random
+from unittest import TestCase
+
+from parse_2d import Diagram, TinyRegion
+from parse_2d.tokens import (
+    Directions,
+    IncrementalTokenization,
+    TemplateTokenizer,
+    TinyTokenizer,
+    Token,
+    WireTokenizer,
+    tokenize,
+)
+
+
+class LenientTemplateTokenizer(TemplateTokenizer):
+    def extract_token(self, diagram, index):
+        try:
+            return super().extract_token(diagram, index)
+        except IndexError:
+            return Token(TinyRegion(index), None)
+
+
+class UndeclaredTinyTokenizer(TinyTokenizer):
+    def reach(self):
+        return None
+
+
+class TestIncrementalTokenization(TestCase):
+    @property
+    def sample_tokenizers(self):
+        return [
+            TinyTokenizer("x", 1),
+            LenientTemplateTokenizer(Diagram.from_string("ab\n b"), 2),
+            WireTokenizer(
+                {
+                    "-": Directions.horizontal,
+                    "|": Directions.vertical,
+                    "+": Directions.all,
+                }
+            ),
+        ]
+
+    def test_retokenize_single_edit(self):
+        diagram = Diagram.from_string("x-+  \n  |  \nab  x\n b   ")
+        tokenizers = self.sample_tokenizers
+        tokenization = IncrementalTokenization.tokenize(diagram, tokenizers)
+
+        self.assertEqual(list(tokenize(diagram, tokenizers)), tokenization.tokens)
+
+        diagram[(4, 2)] = " "
+        removed, added = tokenization.retokenize()
+
+        self.assertEqual([Token(TinyRegion((4, 2)), 1)], removed)
+        self.assertEqual([], added)
+        self.assertEqual(list(tokenize(diagram, tokenizers)), tokenization.tokens)
+
+    def test_retokenize_matches_tokenize(self):
+        random = Random(0)
+        diagram = Diagram.from_string("\n".join([" " * 12] * 8))
+        tokenizers = self.sample_tokenizers
+        tokenization = IncrementalTokenization.tokenize(diagram, tokenizers)
+
+        for _ in range(300):
+            for _ in range(random.randint(1, 3)):
+                index = random.randrange(12), random.randrange(8)
+                diagram[index] = random.choice("    x-|+ab")
+
+            tokenization.retokenize()
+
+            self.assertEqual(list(tokenize(diagram, tokenizers)), tokenization.tokens)
+
+    def test_retokenize_unbounded_reach(self):
+        diagram = Diagram.from_string("xx\n x")
+        tokenizers = [UndeclaredTinyTokenizer("x", 1)]
+        tokenization = IncrementalTokenization.tokenize(diagram, tokenizers)
+
+        del diagram[(0, 0)]
+        removed, added = tokenization.retokenize()
+
+        self.assertEqual(3, len(removed))
+        self.assertEqual(2, len(added))
+        self.assertEqual(list(tokenize(diagram, tokenizers)), tokenization.tokens)
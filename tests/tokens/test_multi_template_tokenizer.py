@@ -0,0 +1,151 @@
+from random import Random
+from unittest import TestCase
+
+from parse_2d import Diagram, SparseRegion
+from parse_2d.tokens import (
+    AnySymbol,
+    MultiTemplateTokenizer,
+    OneOf,
+    TemplateTokenizer,
+    Token,
+    tokenize,
+)
+
+
+def first_match(tokenizers, diagram, index):
+    for tokenizer in tokenizers:
+        if not tokenizer.starts_on(diagram[index]):
+            continue
+
+        try:
+            return tokenizer.extract_token(diagram, index)
+        except IndexError:
+            pass
+
+    return None
+
+
+class TestMultiTemplateTokenizer(TestCase):
+    @property
+    def sample_tokenizers(self):
+        return [
+            TemplateTokenizer(Diagram.from_string("abc"), "abc"),
+            TemplateTokenizer(Diagram.from_string("bc"), "bc"),
+            TemplateTokenizer(Diagram.from_string("x\nyy"), "xyy"),
+            TemplateTokenizer(Diagram.from_string("a a"), "a a"),
+            TemplateTokenizer({(0, 0): "c", (1, 0): " "}, "c "),
+        ]
+
+    def test_multi_template_tokenizer_starts_on(self):
+        tokenizer = MultiTemplateTokenizer(self.sample_tokenizers)
+
+        self.assertTrue(tokenizer.starts_on("a"))
+        self.assertTrue(tokenizer.starts_on("y"))
+        self.assertFalse(tokenizer.starts_on("z"))
+        self.assertEqual(2, tokenizer.reach())
+
+    def test_multi_template_tokenizer_extract_token(self):
+        diagram = Diagram.from_string("abcabc\n x  bc\n yy c")
+        tokenizer = MultiTemplateTokenizer(self.sample_tokenizers)
+
+        self.assertEqual(
+            Token(SparseRegion(frozenset([(0, 0), (1, 0), (2, 0)])), "abc"),
+            tokenizer.extract_token(diagram, (1, 0)),
+        )
+        self.assertEqual(
+            Token(SparseRegion(frozenset([(1, 1), (1, 2), (2, 2)])), "xyy"),
+            tokenizer.extract_token(diagram, (2, 2)),
+        )
+        self.assertEqual(
+            Token(SparseRegion(frozenset([(4, 1), (5, 1)])), "bc"),
+            tokenizer.extract_token(diagram, (4, 1)),
+        )
+        self.assertEqual(
+            Token(SparseRegion(frozenset([(4, 2), (5, 2)])), "c "),
+            tokenizer.extract_token(diagram, (4, 2)),
+        )
+
+        with self.assertRaises(IndexError):
+            tokenizer.extract_token(Diagram.from_string("xy"), (0, 0))
+
+    def test_multi_template_tokenizer_diagram_written(self):
+        diagram = Diagram.from_string("ab")
+        tokenizer = MultiTemplateTokenizer(self.sample_tokenizers)
+
+        with self.assertRaises(IndexError):
+            tokenizer.extract_token(diagram, (0, 0))
+
+        diagram.contents[0].append(" ")
+        diagram[(2, 0)] = "c"
+
+        self.assertEqual(
+            Token(SparseRegion(frozenset([(0, 0), (1, 0), (2, 0)])), "abc"),
+            tokenizer.extract_token(diagram, (0, 0)),
+        )
+
+    def test_multi_template_tokenizer_first_match(self):
+        random = Random(0)
+        tokenizers = [
+            TemplateTokenizer(
+                Diagram.from_string(
+                    "\n".join(
+                        "".join(
+                            random.choice("ab ") for _ in range(random.randint(1, 3))
+                        )
+                        for _ in range(random.randint(1, 2))
+                    ).strip()
+                    or "a"
+                ),
+                i,
+            )
+            for i in range(20)
+        ]
+        tokenizer = MultiTemplateTokenizer(tokenizers)
+
+        for _ in range(10):
+            diagram = Diagram.from_string(
+                "\n".join(
+                    "".join(random.choice("aab ") for _ in range(12)) for _ in range(8)
+                )
+            )
+
+            for index, symbol in diagram.items():
+                with self.subTest(diagram=diagram, index=index):
+                    token = first_match(tokenizers, diagram, index)
+
+                    if token is None:
+                        with self.assertRaises(IndexError):
+                            tokenizer.extract_token(diagram, index)
+                    else:
+                        self.assertEqual(token, tokenizer.extract_token(diagram, index))
+
+    def test_multi_template_tokenizer_symbol_classes(self):
+        tokenizers = [
+            TemplateTokenizer({(0, 0): "a", (1, 0): OneOf("bc")}, 1),
+            TemplateTokenizer({(0, 0): AnySymbol(), (1, 0): "c"}, 2),
+        ]
+        tokenizer = MultiTemplateTokenizer(tokenizers)
+        diagram = Diagram.from_string("abacbc")
+
+        for index, symbol in diagram.items():
+            with self.subTest(index=index):
+                token = first_match(tokenizers, diagram, index)
+
+                if token is None:
+                    with self.assertRaises(IndexError):
+                        tokenizer.extract_token(diagram, index)
+                else:
+                    self.assertEqual(token, tokenizer.extract_token(diagram, index))
+
+    def test_tokenize(self):
+        diagram = Diagram.from_string("abc bc\nx\nyy")
+
+        self.assertEqual(
+            ["abc", "bc", "xyy"],
+            [
+                token.value
+                for token in tokenize(
+                    diagram, [MultiTemplateTokenizer(self.sample_tokenizers)]
+                )
+            ],
+        )
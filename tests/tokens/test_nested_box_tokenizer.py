@@ -0,0 +1,134 @@
+from unittest import TestCase
+
+from parse_2d import Diagram, RectRegion, Token
+from parse_2d.tokens import BoxTokenizer, Directions, NestedBoxTokenizer, tokenize
+
+edge_symbols = {
+    Directions.UP: frozenset({"─"}),
+    Directions.UP_RIGHT: frozenset({"┐"}),
+    Directions.RIGHT: frozenset({"│"}),
+    Directions.DOWN_RIGHT: frozenset({"┘"}),
+    Directions.DOWN: frozenset({"─"}),
+    Directions.DOWN_LEFT: frozenset({"└"}),
+    Directions.LEFT: frozenset({"│"}),
+    Directions.UP_LEFT: frozenset({"┌"}),
+}
+
+
+class TestNestedBoxTokenizer(TestCase):
+    @property
+    def sample_diagram(self):
+        return Diagram.from_string(
+            "┌───────────┐ ┌─────┐\n"
+            "│┌─────┐    │ │┌───┐│\n"
+            "││┌───┐│    │ ││┌─┐││\n"
+            "│││ a ││ b  │ │││ │││\n"
+            "││└───┘│    │ ││└─┘││\n"
+            "│└─────┘┌─┐ │ │└───┘│\n"
+            "│       │ │ │ └─────┘\n"
+            "│       └─┘ │\n"
+            "└───────────┘"
+        )
+
+    @staticmethod
+    def box_children(diagram, children):
+        return [(child.region, child.value) for child in children]
+
+    def test_nested_box_tokenizer_extract_token(self):
+        tokenizer = NestedBoxTokenizer(edge_symbols, self.box_children)
+        diagram = self.sample_diagram
+
+        inner_box = [(RectRegion((1, 1), (6, 4)), [])]
+        token = Token(
+            RectRegion((0, 0), (13, 9)),
+            [
+                (RectRegion((1, 1), (8, 6)), inner_box),
+                (RectRegion((8, 5), (11, 8)), []),
+            ],
+        )
+
+        self.assertEqual(token, tokenizer.extract_token(diagram, (0, 0)))
+        self.assertEqual(token, tokenizer.extract_token(diagram, (3, 2)))
+        self.assertEqual(token, tokenizer.extract_token(diagram, (4, 3)))
+        self.assertIsNone(tokenizer.extract_token(diagram, (13, 0)))
+
+        self.assertEqual(
+            [
+                token,
+                Token(
+                    RectRegion((14, 0), (21, 7)),
+                    [
+                        (
+                            RectRegion((1, 1), (6, 6)),
+                            [(RectRegion((1, 1), (4, 4)), [])],
+                        )
+                    ],
+                ),
+            ],
+            list(tokenize(diagram, [tokenizer])),
+        )
+
+    def test_nested_box_tokenizer_identical_boxes(self):
+        tokenized = []
+
+        def contents_tokenizer(diagram, children):
+            tokenized.append(diagram.copy().contents)
+
+            return len(tokenized)
+
+        tokenizer = NestedBoxTokenizer(edge_symbols, contents_tokenizer)
+        diagram = self.sample_diagram
+
+        tokens = list(tokenize(diagram, [tokenizer]))
+
+        # The smallest boxes on the left and the right are the same
+        self.assertEqual(6, len(tokenized))
+        self.assertEqual(6, tokenizer.nested_tokens(diagram).contents_tokenized)
+        self.assertEqual([6, 5], [token.value for token in tokens])
+        self.assertEqual(
+            [list("┌─┐"), list("│ │"), list("└─┘")],
+            tokenized[0],
+        )
+
+    def test_nested_box_tokenizer_box_tokenizer(self):
+        def box_contents(diagram):
+            (_, _), (width, height) = diagram.bounds
+
+            return [
+                (token.region, token.value)
+                for token in tokenize(
+                    diagram[(1, 1) : (width - 1, height - 1)], [box_tokenizer]
+                )
+            ]
+
+        box_tokenizer = BoxTokenizer(edge_symbols, box_contents)
+
+        def nested_contents(diagram, children):
+            # Regions relative to the contents, rather than the box
+            return [
+                (
+                    RectRegion(
+                        child.region.top_left + Directions.UP_LEFT.value,
+                        child.region.bottom_right + Directions.UP_LEFT.value,
+                    ),
+                    child.value,
+                )
+                for child in children
+            ]
+
+        nested_box_tokenizer = NestedBoxTokenizer(edge_symbols, nested_contents)
+
+        self.assertEqual(
+            list(tokenize(self.sample_diagram, [box_tokenizer])),
+            list(tokenize(self.sample_diagram, [nested_box_tokenizer])),
+        )
+
+    def test_nested_box_tokenizer_diagram_written(self):
+        tokenizer = NestedBoxTokenizer(edge_symbols, self.box_children)
+        diagram = self.sample_diagram
+
+        self.assertEqual(2, len(tokenizer.extract_token(diagram, (0, 0)).value))
+
+        diagram[(9, 5)] = " "
+
+        self.assertEqual(1, len(tokenizer.extract_token(diagram, (0, 0)).value))
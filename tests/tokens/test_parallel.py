@@ -0,0 +1,153 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from parse_2d import Diagram
+from parse_2d.tokens import (
+    BoxTokenizer,
+    Directions,
+    TemplateTokenizer,
+    TinyTokenizer,
+    WireTokenizer,
+    tokenize,
+    tokenize_many,
+    tokenize_parallel,
+)
+
+
+def box_contents(diagram):
+    (_, _), (width, height) = diagram.bounds
+
+    return "".join(
+        value for _, value in diagram.items_within((1, 1), (width - 1, height - 1))
+    )
+
+
+class TestTokenizeParallel(TestCase):
+    @property
+    def sample_diagram(self):
+        return Diagram.from_string(
+            "\n".join(
+                [
+                    "x-+  ab  ┌──┐ x",
+                    "  |   b  │xy│  ",
+                    "  +-x    └──┘ p",
+                    "x    ab  ┌─┐  q",
+                    " --+  b x│ │   ",
+                    "   |  x  └─┘--x",
+                ]
+            )
+        )
+
+    @property
+    def sample_tokenizers(self):
+        return [
+            TinyTokenizer("x", 1),
+            TemplateTokenizer(Diagram.from_string("ab\n b"), 2),
+            TemplateTokenizer(Diagram.from_string("p\nq"), 3),
+            WireTokenizer(
+                {
+                    "-": Directions.horizontal,
+                    "|": Directions.vertical,
+                    "+": Directions.all,
+                }
+            ),
+            BoxTokenizer(
+                {
+                    Directions.UP: frozenset({"─"}),
+                    Directions.UP_RIGHT: frozenset({"┐"}),
+                    Directions.RIGHT: frozenset({"│"}),
+                    Directions.DOWN_RIGHT: frozenset({"┘"}),
+                    Directions.DOWN: frozenset({"─"}),
+                    Directions.DOWN_LEFT: frozenset({"└"}),
+                    Directions.LEFT: frozenset({"│"}),
+                    Directions.UP_LEFT: frozenset({"┌"}),
+                },
+                box_contents,
+            ),
+        ]
+
+    def test_tokenize_parallel(self):
+        diagram = self.sample_diagram
+        tokenizers = self.sample_tokenizers
+
+        for band_height in (1, 2, 4, 10):
+            with self.subTest(band_height=band_height):
+                self.assertEqual(
+                    list(tokenize(diagram, tokenizers)),
+                    list(
+                        tokenize_parallel(
+                            diagram, tokenizers, workers=2, band_height=band_height
+                        )
+                    ),
+                )
+
+    def test_tokenize_parallel_mapped_diagram(self):
+        diagram = self.sample_diagram
+        tokenizers = self.sample_tokenizers
+
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "diagram.txt"
+            path.write_text(
+                "\n".join("".join(row) for row in diagram.contents), encoding="utf-8"
+            )
+
+            with Diagram.from_file(path) as mapped_diagram:
+                self.assertEqual(
+                    list(tokenize(diagram, tokenizers)),
+                    list(tokenize_parallel(mapped_diagram, tokenizers, workers=2)),
+                )
+
+    def test_tokenize_parallel_single_worker(self):
+        diagram = self.sample_diagram
+        tokenizers = self.sample_tokenizers
+
+        self.assertEqual(
+            list(tokenize(diagram, tokenizers)),
+            list(tokenize_parallel(diagram, tokenizers, workers=1)),
+        )
+
+
+class TestTokenizeMany(TestCase):
+    @property
+    def sample_diagrams(self):
+        return {
+            i: Diagram.from_string("x-+ \n  |x\nx-+ "[i:] + "x" * i) for i in range(10)
+        }
+
+    @property
+    def sample_tokenizers(self):
+        return [
+            TinyTokenizer("x", 1),
+            WireTokenizer(
+                {
+                    "-": Directions.horizontal,
+                    "|": Directions.vertical,
+                    "+": Directions.all,
+                }
+            ),
+        ]
+
+    def test_tokenize_many(self):
+        diagrams = self.sample_diagrams
+        tokenizers = self.sample_tokenizers
+
+        for workers, chunk_size in [(1, 1), (2, 1), (2, 3), (3, 16)]:
+            with self.subTest(workers=workers, chunk_size=chunk_size):
+                results = dict(
+                    tokenize_many(
+                        diagrams.items(),
+                        tokenizers,
+                        workers=workers,
+                        chunk_size=chunk_size,
+                        max_in_flight=2,
+                    )
+                )
+
+                self.assertEqual(
+                    {
+                        diagram_id: list(tokenize(diagram, tokenizers))
+                        for diagram_id, diagram in diagrams.items()
+                    },
+                    results,
+                )
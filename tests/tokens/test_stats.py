@@ -0,0 +1,86 @@
+from unittest import TestCase
+
+from parse_2d import Diagram
+from parse_2d.tokens import (
+    Directions,
+    TemplateTokenizer,
+    TinyTokenizer,
+    TokenizeStats,
+    WireTokenizer,
+    WorkBudget,
+    tokenize,
+)
+
+
+class UndeclaredTinyTokenizer(TinyTokenizer):
+    def start_symbols(self):
+        return None
+
+
+class MissingTinyTokenizer(TinyTokenizer):
+    def extract_token(self, diagram, index):
+        return None
+
+
+class TestTokenizeStats(TestCase):
+    def test_tokenize_stats(self):
+        diagram = Diagram.from_string("x-+ aaa\n  |    \n      x")
+        tiny_tokenizer = UndeclaredTinyTokenizer("x", 1)
+        template_tokenizer = TemplateTokenizer(Diagram.from_string("aa"), 2)
+        wire_tokenizer = WireTokenizer(
+            {
+                "-": Directions.horizontal,
+                "|": Directions.vertical,
+                "+": Directions.all,
+            }
+        )
+        tokenizers = [tiny_tokenizer, template_tokenizer, wire_tokenizer]
+        stats = TokenizeStats()
+
+        self.assertEqual(
+            list(tokenize(diagram, tokenizers)),
+            list(tokenize(diagram, tokenizers, stats=stats)),
+        )
+
+        self.assertEqual(5, stats[tiny_tokenizer].starts_on_calls)
+        self.assertEqual(2, stats[tiny_tokenizer].extract_calls)
+        self.assertEqual(2, stats[tiny_tokenizer].cells_covered)
+
+        self.assertEqual(0, stats[template_tokenizer].starts_on_calls)
+        self.assertEqual(2, stats[template_tokenizer].extract_calls)
+        self.assertEqual(0, stats[template_tokenizer].extract_failures)
+        self.assertEqual(4, stats[template_tokenizer].cells_covered)
+        self.assertEqual(1, stats[template_tokenizer].events["failed_matches"])
+
+        self.assertEqual(1, stats[wire_tokenizer].extract_calls)
+        self.assertEqual(5, stats[wire_tokenizer].events["expansions"])
+
+        self.assertEqual(3, len(list(stats.items())))
+
+    def test_tokenize_stats_failure(self):
+        diagram = Diagram.from_string("ab\nb ")
+        template_tokenizer = TemplateTokenizer(Diagram.from_string("ab"), 2)
+        stats = TokenizeStats()
+
+        with self.assertRaises(IndexError):
+            list(tokenize(diagram, [template_tokenizer], stats=stats))
+
+        self.assertEqual(2, stats[template_tokenizer].extract_calls)
+        self.assertEqual(1, stats[template_tokenizer].extract_failures)
+
+    def test_tokenize_stats_missing_token(self):
+        diagram = Diagram.from_string("x x")
+        tiny_tokenizer = MissingTinyTokenizer("x", 1)
+        stats = TokenizeStats()
+
+        with self.assertRaises(IndexError):
+            list(tokenize(diagram, [tiny_tokenizer]))
+
+        with self.assertRaises(IndexError):
+            list(tokenize(diagram, [tiny_tokenizer], stats=stats))
+
+        with self.assertRaises(IndexError):
+            list(tokenize(diagram, [tiny_tokenizer], budget=WorkBudget(steps=10)))
+
+        self.assertEqual(1, stats[tiny_tokenizer].extract_calls)
+        self.assertEqual(1, stats[tiny_tokenizer].extract_failures)
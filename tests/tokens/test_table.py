@@ -0,0 +1,88 @@
+import pickle
+from unittest import TestCase
+
+from parse_2d import Diagram, RectRegion
+from parse_2d.tokens import (
+    BoxTokenizer,
+    Directions,
+    TemplateTokenizer,
+    TinyTokenizer,
+    TokenTable,
+    WireTokenizer,
+    tokenize,
+    tokenize_table,
+)
+
+
+class TestTokenTable(TestCase):
+    @property
+    def sample_diagram(self):
+        return Diagram.from_string("x-+ ab ┌─┐\n  |  x │ │\nab  x  └─┘")
+
+    @property
+    def sample_tokenizers(self):
+        return [
+            TinyTokenizer("x", 1),
+            TemplateTokenizer(Diagram.from_string("ab"), ["ab"]),
+            WireTokenizer(
+                {
+                    "-": Directions.horizontal,
+                    "|": Directions.vertical,
+                    "+": Directions.all,
+                }
+            ),
+            BoxTokenizer(
+                {
+                    Directions.UP: frozenset({"─"}),
+                    Directions.UP_RIGHT: frozenset({"┐"}),
+                    Directions.RIGHT: frozenset({"│"}),
+                    Directions.DOWN_RIGHT: frozenset({"┘"}),
+                    Directions.DOWN: frozenset({"─"}),
+                    Directions.DOWN_LEFT: frozenset({"└"}),
+                    Directions.LEFT: frozenset({"│"}),
+                    Directions.UP_LEFT: frozenset({"┌"}),
+                },
+                lambda diagram: "box",
+            ),
+        ]
+
+    def test_tokenize_table(self):
+        diagram = self.sample_diagram
+        tokenizers = self.sample_tokenizers
+        table = tokenize_table(diagram, tokenizers)
+
+        self.assertEqual(list(tokenize(diagram, tokenizers)), list(table))
+        self.assertEqual(7, len(table))
+        self.assertEqual([0, 2, 1, 3, 0, 1, 0], list(table.tokenizer_ids))
+        self.assertEqual([(0, 0), (1, 0)], [table.start(0), table.start(1)])
+
+    def test_token_table_columns(self):
+        table = tokenize_table(self.sample_diagram, self.sample_tokenizers)
+
+        self.assertEqual(((1, 0), (3, 2)), table.bounding_box(1))
+        self.assertEqual(((7, 0), (10, 3)), table.bounding_box(3))
+        self.assertEqual(RectRegion((7, 0), (10, 3)), table.region(3))
+        self.assertEqual([(4, 0), (5, 0)], sorted(table.cells(2)))
+
+        # Equal hashable values are stored once
+        self.assertEqual(5, len(table.values))
+        self.assertEqual(table.value_ids[0], table.value_ids[4])
+
+    def test_token_table_unhashable_values(self):
+        table = tokenize_table(self.sample_diagram, self.sample_tokenizers)
+
+        self.assertEqual(["ab"], table[2].value)
+        self.assertNotEqual(table.value_ids[2], table.value_ids[5])
+
+    def test_token_table_pickle(self):
+        table = tokenize_table(self.sample_diagram, self.sample_tokenizers)
+        unpickled_table = pickle.loads(pickle.dumps(table))
+
+        self.assertEqual(table, unpickled_table)
+        self.assertEqual(list(table), list(unpickled_table))
+
+    def test_token_table_empty(self):
+        table = TokenTable()
+
+        self.assertEqual(0, len(table))
+        self.assertEqual([], list(table))
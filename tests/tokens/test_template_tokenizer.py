@@ -1,7 +1,7 @@
 from unittest import TestCase
 
 from parse_2d import Diagram, SparseRegion
-from parse_2d.tokens import TemplateTokenizer, Token, tokenize
+from parse_2d.tokens import AnySymbol, OneOf, TemplateTokenizer, Token, tokenize
 
 
 class TestTemplateTokenizer(TestCase):
@@ -38,6 +38,58 @@ class TestTemplateTokenizer(TestCase):
             tokenizer.extract_token(self.sample_diagram, (2, 0)),
         )
 
+    def test_template_tokenizer_anchors(self):
+        tokenizer = TemplateTokenizer(Diagram.from_string("aab\n a"), 1)
+
+        self.assertEqual({"a", "b"}, set(tokenizer.anchors))
+        self.assertEqual(3, len(tokenizer.anchors["a"]))
+        self.assertEqual(
+            [(1, 0, "b"), (-1, 0, "a"), (0, 1, "a")],
+            tokenizer.anchors["a"][1].checks,
+        )
+
+    def test_template_tokenizer_find_all(self):
+        tokenizer = TemplateTokenizer(Diagram.from_string("ab\n b"), 1)
+        diagram = Diagram.from_string("abab\n bab\n  ab\nab b\n b")
+
+        self.assertEqual(
+            list(tokenize(diagram, [tokenizer])), tokenizer.find_all(diagram),
+        )
+
+        diagram.index_symbols()
+
+        self.assertEqual(
+            list(tokenize(diagram, [tokenizer])), tokenizer.find_all(diagram),
+        )
+
+        with self.assertRaises(IndexError):
+            tokenizer.find_all(Diagram.from_string("ab\nb"))
+
+    def test_template_tokenizer_symbol_classes(self):
+        tokenizer = TemplateTokenizer(
+            {(0, 0): "R", (1, 0): OneOf("-="), (2, 0): AnySymbol()}, 1
+        )
+        diagram = Diagram.from_string("R=x R-  R+y")
+
+        self.assertTrue(tokenizer.starts_on("R"))
+        self.assertFalse(tokenizer.starts_on("="))
+        self.assertEqual(
+            Token(region=SparseRegion(frozenset([(0, 0), (1, 0), (2, 0)])), value=1),
+            tokenizer.extract_token(diagram, (0, 0)),
+        )
+
+        with self.assertRaises(IndexError):
+            tokenizer.extract_token(diagram, (4, 0))
+
+        with self.assertRaises(IndexError):
+            tokenizer.extract_token(diagram, (8, 0))
+
+        diagram = Diagram.from_string("R=xR--\nR-R")
+
+        self.assertEqual(
+            list(tokenize(diagram, [tokenizer])), tokenizer.find_all(diagram),
+        )
+
     def test_tokenize(self):
         a_obj = object()
         b_obj = object()
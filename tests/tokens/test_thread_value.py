@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from parse_2d.tokens.thread_value import ThreadValue
+
+
+class TestThreadValue(TestCase):
+    def test_thread_value_set_reset(self):
+        value = ThreadValue()
+        self.assertIsNone(value.get())
+
+        token = value.set(1)
+        self.assertEqual(1, value.get())
+
+        inner_token = value.set(2)
+        self.assertEqual(2, value.get())
+
+        value.reset(inner_token)
+        self.assertEqual(1, value.get())
+
+        value.reset(token)
+        self.assertIsNone(value.get())
+
+    def test_thread_value_threads(self):
+        value = ThreadValue()
+        value.set(1)
+
+        with ThreadPoolExecutor(1) as executor:
+            self.assertIsNone(executor.submit(value.get).result())
+
+        self.assertEqual(1, value.get())
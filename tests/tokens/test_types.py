@@ -0,0 +1,92 @@
+from unittest import TestCase
+
+from parse_2d import Diagram, TinyRegion
+from parse_2d.tokens import TinyTokenizer, Token, TokenizerSet, tokenize
+
+
+class UndeclaredTinyTokenizer(TinyTokenizer):
+    def start_symbols(self):
+        return None
+
+
+class TestTokenizerSet(TestCase):
+    def test_tokenizer_set_dispatch_table(self):
+        a_tokenizer = TinyTokenizer("a", 1)
+        b_tokenizer = TinyTokenizer("b", 2)
+        other_a_tokenizer = TinyTokenizer("a", 3)
+
+        tokenizer_set = TokenizerSet.compile(
+            [a_tokenizer, b_tokenizer, other_a_tokenizer]
+        )
+
+        self.assertTrue(tokenizer_set.is_fully_declared)
+        self.assertEqual(
+            {"a": (a_tokenizer, other_a_tokenizer), "b": (b_tokenizer,)},
+            tokenizer_set.dispatch_table,
+        )
+        self.assertEqual((), tokenizer_set.candidates("c"))
+
+    def test_tokenizer_set_respects_starts_on(self):
+        class NeverTinyTokenizer(TinyTokenizer):
+            def starts_on(self, symbol):
+                return False
+
+        tokenizer_set = TokenizerSet.compile([NeverTinyTokenizer("a", 1)])
+
+        self.assertEqual({}, tokenizer_set.dispatch_table)
+
+    def test_tokenizer_set_fallback(self):
+        a_tokenizer = TinyTokenizer("a", 1)
+        undeclared_a_tokenizer = UndeclaredTinyTokenizer("a", 2)
+
+        tokenizer_set = TokenizerSet.compile([undeclared_a_tokenizer, a_tokenizer])
+
+        self.assertFalse(tokenizer_set.is_fully_declared)
+        self.assertEqual(
+            [undeclared_a_tokenizer, a_tokenizer], tokenizer_set.candidates("a")
+        )
+        self.assertEqual([], tokenizer_set.candidates("b"))
+
+    def test_tokenizer_set_compile_idempotent(self):
+        tokenizer_set = TokenizerSet.compile([TinyTokenizer("a", 1)])
+
+        self.assertIs(tokenizer_set, TokenizerSet.compile(tokenizer_set))
+
+    def test_tokenize_tokenizer_set(self):
+        a_obj = object()
+        b_obj = object()
+
+        tokenizer_set = TokenizerSet.compile(
+            [UndeclaredTinyTokenizer("a", a_obj), TinyTokenizer("b", b_obj)]
+        )
+
+        self.assertEqual(
+            [
+                Token(region=TinyRegion(location=(0, 0)), value=a_obj),
+                Token(region=TinyRegion(location=(2, 0)), value=b_obj),
+                Token(region=TinyRegion(location=(0, 1)), value=b_obj),
+                Token(region=TinyRegion(location=(1, 1)), value=a_obj),
+            ],
+            list(tokenize(Diagram.from_string("a b\nba"), tokenizer_set)),
+        )
+
+    def test_tokenize_symbol_index(self):
+        a_obj = object()
+        b_obj = object()
+
+        diagram = Diagram.from_string("a b\nbac")
+        diagram.index_symbols()
+        diagram[(2, 1)] = "b"
+
+        tokenizers = [TinyTokenizer("b", b_obj), TinyTokenizer("a", a_obj)]
+
+        self.assertEqual(
+            [
+                Token(region=TinyRegion(location=(0, 0)), value=a_obj),
+                Token(region=TinyRegion(location=(2, 0)), value=b_obj),
+                Token(region=TinyRegion(location=(0, 1)), value=b_obj),
+                Token(region=TinyRegion(location=(1, 1)), value=a_obj),
+                Token(region=TinyRegion(location=(2, 1)), value=b_obj),
+            ],
+            list(tokenize(diagram, tokenizers)),
+        )
@@ -1,7 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List
 from unittest import TestCase
 
-from parse_2d import Diagram
-from parse_2d.tokens import Directions, Token, Wire, WireSocket, WireTokenizer
+from parse_2d import Diagram, TextDiagram
+from parse_2d.tokens import (
+    Directions,
+    Token,
+    Wire,
+    WireSocket,
+    WireTokenizer,
+    tokenize,
+)
 
 
 class TestWireTokenizer(TestCase):
@@ -52,6 +64,45 @@ class TestWireTokenizer(TestCase):
             token, tokenizer.extract_token(self.sample_diagram, (2, 1)),
         )
 
+    def test_wire_tokenizer_diagram_written(self):
+        diagram = self.sample_diagram
+
+        tokenizer = WireTokenizer(
+            {
+                "─": Directions.horizontal,
+                "┐": {Directions.LEFT.value, Directions.DOWN.value},
+                "└": {Directions.UP.value, Directions.RIGHT.value},
+            }
+        )
+
+        self.assertEqual(
+            {(1, 0), (2, 0), (2, 1), (3, 1), (4, 1)},
+            tokenizer.extract_token(diagram, (1, 0)).region,
+        )
+
+        diagram[(3, 1)] = " "
+
+        self.assertEqual(
+            {(1, 0), (2, 0), (2, 1)}, tokenizer.extract_token(diagram, (1, 0)).region,
+        )
+
+    def test_wire_tokenizer_masks_not_kept(self):
+        diagram = self.sample_diagram
+
+        tokenizer = WireTokenizer(
+            {
+                "─": Directions.horizontal,
+                "┐": {Directions.LEFT.value, Directions.DOWN.value},
+                "└": {Directions.UP.value, Directions.RIGHT.value},
+            }
+        )
+
+        with diagram.deriving():
+            tokenizer.extract_token(diagram, (1, 0))
+
+            # Masks are only held for the extraction
+            self.assertIsNone(diagram.derived)
+
     def test_wire_tokenizer_wire_loop(self):
         diagram = Diagram.from_string("┌─┐\n└─┘")
 
@@ -131,3 +182,125 @@ class TestWireTokenizer(TestCase):
             self.assertEqual(
                 lower_square_token, tokenizer.extract_token(two_squares_diagram, (2, 2))
             )
+
+        with self.subTest("Extract all"):
+            self.assertEqual(
+                [upper_square_token, lower_square_token],
+                tokenizer.extract_all(two_squares_diagram),
+            )
+
+    def test_wire_tokenizer_extract_all(self):
+        diagram = Diagram.from_string("a─┐ ─\n  └──b\n┌─┐ └─\n└─┘a─┘")
+
+        tokenizer = WireTokenizer(
+            {
+                "─": Directions.horizontal,
+                "┌": {Directions.DOWN.value, Directions.RIGHT.value},
+                "┐": {Directions.LEFT.value, Directions.DOWN.value},
+                "└": {Directions.UP.value, Directions.RIGHT.value},
+                "┘": {Directions.LEFT.value, Directions.UP.value},
+            }
+        )
+
+        self.assertEqual(
+            list(tokenize(diagram, [tokenizer])), tokenizer.extract_all(diagram)
+        )
+        self.assertEqual(5, len(tokenizer.extract_all(diagram)))
+
+    def test_wire_tokenizer_straight_runs(self):
+        class WalkingWireTokenizer(WireTokenizer[str]):
+            """
+            Wire tokenizer that walks every cell of its wires
+            """
+
+            def connections(self, segment, incoming_direction=None):
+                return super().connections(segment, incoming_direction)
+
+        segment_connections = {
+            "─": Directions.horizontal,
+            "│": Directions.vertical,
+            "┬": {
+                Directions.LEFT.value,
+                Directions.RIGHT.value,
+                Directions.DOWN.value,
+            },
+            "┘": {Directions.LEFT.value, Directions.UP.value},
+        }
+        text = "a──────┬─────b\n       │\n ──────┘\n       │\n       c"
+
+        expected = list(
+            tokenize(
+                Diagram.from_string(text), [WalkingWireTokenizer(segment_connections)]
+            )
+        )
+
+        for diagram in [Diagram.from_string(text), TextDiagram.from_string(text)]:
+            with self.subTest(diagram=type(diagram).__name__):
+                tokenizer = WireTokenizer(segment_connections)
+
+                self.assertEqual(expected, list(tokenize(diagram, [tokenizer])))
+                self.assertEqual(expected, tokenizer.extract_all(diagram))
+
+    def test_wire_tokenizer_mapped_column_run(self):
+        tokenizer = WireTokenizer({"│": Directions.vertical})
+
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "diagram.txt"
+            path.write_text("a\n│\n│\nb\n" + "x\n" * 1000, encoding="utf-8")
+
+            with Diagram.from_file(path) as diagram:
+                self.assertEqual(
+                    {(0, 1), (0, 2)}, tokenizer.extract_token(diagram, (0, 1)).region
+                )
+
+                # Only the rows around the wire are read
+                self.assertFalse(diagram.contents.is_indexed)
+
+    def test_wire_tokenizer_state(self):
+        @dataclass(frozen=True)
+        class CountedWire(Wire):
+            steps: int
+
+        class CountingWireTokenizer(WireTokenizer[str]):
+            """
+            Wire tokenizer that counts the steps taken walking each wire
+            """
+
+            def new_state(self) -> List[int]:
+                return [0]
+
+            def connections(self, segment, incoming_direction=None, state=None):
+                if incoming_direction is not None:
+                    state[0] += 1
+
+                return super().connections(segment, incoming_direction, state)
+
+            def wire_value(self, sockets, state):
+                return CountedWire(sockets, state[0])
+
+        tokenizer = CountingWireTokenizer({"─": Directions.horizontal})
+        diagrams = [
+            Diagram.from_string("\n".join("─" * length for _ in range(3)))
+            for length in range(1, 50)
+        ]
+
+        expected = [
+            [token.value.steps for token in tokenize(diagram, [tokenizer])]
+            for diagram in diagrams
+        ]
+
+        self.assertEqual([2, 2, 2], expected[1])
+
+        with ThreadPoolExecutor(8) as executor:
+            self.assertEqual(
+                expected,
+                list(
+                    executor.map(
+                        lambda diagram: [
+                            token.value.steps
+                            for token in tokenize(diagram, [tokenizer])
+                        ],
+                        diagrams,
+                    )
+                ),
+            )